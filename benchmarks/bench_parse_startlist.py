@@ -0,0 +1,106 @@
+"""
+Benchmark: parse_startlist_html (streaming) vs. de vroegere BeautifulSoup-parse.
+
+Controleert eerst dat beide exact dezelfde rennerslijst geven voor alle
+pagina's in een fixture-map (opgenomen met fixtures.py record, of anders
+gegenereerd) en voor een reeks randgevallen, en meet daarna de doorvoer.
+
+    python benchmarks/bench_parse_startlist.py
+    python benchmarks/bench_parse_startlist.py --fixtures fixtures/ --scale 10
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from bs4 import BeautifulSoup
+
+import fixtures
+from fixtures import wm
+
+EDGE_CASES = {
+    "geneste links": '<ul class="startlist_v4"><li><a href="rider/x">POGAČAR <a href="rider/y">Tadej</a></a></li></ul>',
+    "niet gesloten li/a": '<ul class="startlist_v4"><li><a href="rider/a">VAN AERT Wout<li><a href="rider/b">PEDERSEN Mads</ul>',
+    "losse eindtags": '<div><ul class="startlist_v4"></span><li><a href="rider/a">DE LIE Arnaud</a></p></li></ul></div>',
+    "div sluit de lijst": '<div><ul class="startlist_v4"><li><a href="rider/a">A Eerste</a></div><li><a href="rider/b">B Tweede</a></li></ul>',
+    "entiteiten": '<ul class="startlist_v4"><li><a href="rider/a">VAN DER POEL&nbsp;Mathieu &amp; co</a></li></ul>',
+    "twee containers": (
+        '<ul class="startlist_v4"><li><a href="rider/a">EEN Renner</a></li></ul>'
+        '<ul class="x startlist_v4"><li><a href="rider/b">TWEE Renner</a></li></ul>'
+    ),
+    "class elders vermeld": (
+        '<style>.startlist_v4 li { color: red }</style>'
+        '<ul class="startlist_v4"><li><a href="rider/a">EEN Renner</a></li></ul><a href="/rider/b">Na Lijst</a>'
+    ),
+    "link buiten li": '<ul class="startlist_v4"><a href="rider/a">GEEN Li</a></ul><a href="/rider/b">Wel Fallback</a>',
+    "lege tekst in lijst": '<ul class="startlist_v4"><li><a href="rider/a"> </a></li></ul><a href="/rider/b">Niet Gebruikt</a>',
+    "fallback kleine letter": '<a href="/rider/a">kleine letter</a><a href="/rider/b">GROTE Letter</a><a href="rider/c">Geen Slash</a>',
+    "zelfsluitend en void": '<ul class="startlist_v4"><li><a href="rider/a"/><br><img src=x>TEKST<a href="rider/b">NA Void<br/></a></li></ul>',
+    "href zonder waarde": '<ul class="startlist_v4"><li><a href>LEEG</a><a href="rider/a" href="team/x">DUBBEL Href</a></li></ul>',
+    "script in pagina": '<script>var s = "<a href=\'rider/x\'>NEP</a>";</script><a href="/rider/a">ECHT Renner</a>',
+    "geen renners": "<html><body><p>Geen startlijst</p></body></html>",
+}
+
+
+def legacy_parse(html: str) -> list:
+    soup = BeautifulSoup(html, "html.parser")
+    raw_names = [a.text.strip() for a in soup.select("ul.startlist_v4 li a[href*='rider/']")]
+    if not raw_names:
+        raw_names = [a.text.strip() for a in soup.select("a[href*='/rider/']") if a.text.strip() and a.text.strip()[0].isupper()]
+    return [wm.pcs_format(n) for n in raw_names if n.strip()]
+
+
+def load_pages(fixture_dir: str) -> dict:
+    pages = {}
+    for root, _, files in os.walk(fixture_dir):
+        for filename in files:
+            if filename.endswith(".html"):
+                with open(os.path.join(root, filename), encoding="utf-8") as f:
+                    pages[os.path.relpath(os.path.join(root, filename), fixture_dir)] = f.read()
+    return pages
+
+
+def throughput(parse, pages: list, min_seconds: float = 1.0) -> tuple:
+    """(pagina's/s, MB/s) over herhaalde passes tot min_seconds verstreken is."""
+    size = sum(len(p.encode("utf-8")) for p in pages)
+    runs = 0
+    t0 = time.perf_counter()
+    while True:
+        for page in pages:
+            parse(page)
+        runs += 1
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_seconds:
+            return runs * len(pages) / elapsed, runs * size / elapsed / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse-doorvoer van PCS-pagina's.")
+    parser.add_argument("--fixtures", help="fixture-map (standaard: gegenereerd in een tijdelijke map)")
+    parser.add_argument("--scale", type=int, default=1, help="poolgrootte voor gegenereerde fixtures")
+    args = parser.parse_args()
+
+    for naam, html in EDGE_CASES.items():
+        verwacht, gevonden = legacy_parse(html), wm.parse_startlist_html(html)
+        assert gevonden == verwacht, (naam, verwacht, gevonden)
+    print(f"{len(EDGE_CASES)} randgevallen identiek")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fixture_dir = args.fixtures or tmp
+        if not args.fixtures:
+            fixtures.write_fixture_dir(fixture_dir, args.scale)
+        pages = load_pages(fixture_dir)
+
+    for naam, html in pages.items():
+        assert wm.parse_startlist_html(html) == legacy_parse(html), naam
+    print(f"{len(pages)} fixture-pagina's identiek")
+
+    html_pages = list(pages.values())
+    oud = throughput(legacy_parse, html_pages)
+    nieuw = throughput(wm.parse_startlist_html, html_pages)
+    print(f"BeautifulSoup: {oud[0]:8.1f} pagina's/s | {oud[1]:6.2f} MB/s")
+    print(f"streaming:     {nieuw[0]:8.1f} pagina's/s | {nieuw[1]:6.2f} MB/s | x{nieuw[0] / oud[0]:.1f}")
+
+
+if __name__ == "__main__":
+    main()
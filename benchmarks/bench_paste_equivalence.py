@@ -0,0 +1,171 @@
+"""
+Controle + benchmark: extract_riders_from_paste (plak-index) vs. de vroegere
+strikte matcher die per regel alle renners afliep.
+
+Controleert dat de herkende renners identiek zijn (zelfde renners, zelfde
+volgorde) voor gegenereerde "Mijn renners"-pastes en varianten ervan: PCS-
+volgorde (ACHTERNAAM Voornaam), zonder accenten, kleine letters, tikfouten
+en extra ruisregels. Tikfouten vallen bij beide buiten de strikte match; een
+fuzzy treffer is enkel een suggestie. Daarnaast een paar echte pastes (van de
+site, overgetypt, PCS-volgorde, initialen) met de vaste uitvoer van de oude
+matcher op de 1x-pool.
+
+    python benchmarks/bench_paste_equivalence.py
+    python benchmarks/bench_paste_equivalence.py --scale 10 --pastes 500
+"""
+import argparse
+import random
+import re
+import time
+
+import fixtures
+from fixtures import wm
+
+RUIS = ["Mijn ploeg", "Kopman", "Budget: 2,5M resterend", "€ 4,0M", "12", "UAE Team Emirates - XRG", "Wissel"]
+
+# Echte pastes met de verwachte uitvoer van de oude strikte matcher (1x-pool)
+ECHTE_PASTES = [
+    # Rechtstreeks uit "Mijn renners": naam, prijs en ploeg per renner
+    ("Mijn renners\nTadej Pogačar\n€ 7\nUAE Team Emirates - XRG\nWout Van Aert\n€ 6\n"
+     "Team Visma | Lease a Bike\nMatej Mohorič\n€ 4\nBahrain - Victorious\nTomáš Kopecký\n€ 2\n"
+     "Team Visma | Lease a Bike\nIván Romeo\n€ 2\nMovistar Team\nMads Pedersen\n€ 6\nLidl - Trek",
+     ["Tadej Pogačar", "Wout Van Aert", "Matej Mohorič", "Tomáš Kopecký", "Iván Romeo", "Mads Pedersen"]),
+    # Overgetypt: zonder accenten, roepnaam, dubbel, tikfout en een renner die niet start
+    ("tadej pogacar\nwout van aert\nMathieu van der Poel\nTom Pidcock\nmatej mohoric\nWout van Aert\n"
+     "Jasper Philipsn\nBudget: 1,5M resterend",
+     ["Tadej Pogačar", "Wout Van Aert", "Thomas Pidcock", "Matej Mohorič"]),
+    # Gekopieerd van PCS: ACHTERNAAM Voornaam
+    ("POGAČAR Tadej\nVAN AERT Wout\nPHILIPSEN Jasper\nEVENEPOEL Remco\nKopman\n12",
+     ["Tadej Pogačar", "Wout Van Aert", "Jasper Philipsen", "Remco Evenepoel"]),
+    # Eén regel met initialen; enkel een achternaam herkent de strikte matcher niet
+    ("M. Pedersen, C. Pedersen, J. Philipsen, Ganna, F. Ganna, Milan",
+     ["Mads Pedersen", "Casper Pedersen", "Jasper Philipsen", "Filippo Ganna"]),
+]
+
+
+def legacy_extract(text: str, all_riders: list) -> list:
+    """find_best_match_strict zoals vóór de plak-index (enkel de herkende renners)."""
+    kandidaten = [k.strip() for k in re.split(r"[,\n]", text) if k.strip()]
+
+    def is_likely_rider(s: str) -> bool:
+        if re.match(r"^€", s): return False
+        if re.match(r"^\d+[\./,]?\d*$", s): return False
+        if len(s) < 4 or len(s) > 40: return False
+        team_woorden = [
+            "team", "cycling", "intermarché", "intermarche", "premier tech",
+            "emirates", "groupama", "deceuninck", "quickstep", "quick-step",
+            "soudal", "bahrain", "victorious", "ineos", "grenadiers", "visma",
+            "lease", "bike", "alpecin", "uno-x", "lidl", "trek", "cofidis",
+            "bora", "hansgrohe", "jayco", "alula", "movistar", "tudor",
+            "astana", "arkéa", "arkea", "lotto", "red bull", "dsm",
+            "firmenich", "picnic", "postnl", "pol", "rockets", "unibet",
+            "xds", "tarteletto", "bingoal", "flanders", "tomorrow", "q36",
+            "novo nordisk", "nsn", "xrg",
+            "budget", "beheer", "ploeg", "opstelling", "renners", "resterend",
+            "geselecteerde", "minicompetitie", "transfers", "klassement",
+            "statistieken", "spelregels", "prijzen", "overzicht",
+        ]
+        s_lower = s.lower()
+        if any(tw in s_lower for tw in team_woorden): return False
+        if " – " in s or " - " in s: return False
+        return True
+
+    def find_best_match_strict(input_name):
+        words_input = wm.normalize_name(input_name).split()
+        rotaties = [words_input[i:] + words_input[:i] for i in range(len(words_input))]
+        for original in all_riders:
+            norm_original = wm.normalize_name(original)
+            voornaam_letter_orig, achternaam_orig = wm.split_name(norm_original)
+            for rot in rotaties:
+                if len(rot) < 2:
+                    continue
+                voornaam_letter = rot[0][0] if rot[0] else ""
+                achternaam_input = " ".join(rot[1:])
+                if not achternaam_input or not achternaam_orig:
+                    continue
+                if achternaam_input != achternaam_orig:
+                    continue
+                if voornaam_letter and voornaam_letter_orig and voornaam_letter != voornaam_letter_orig:
+                    continue
+                return original
+        return None
+
+    matched = []
+    for kandidaat in (k for k in kandidaten if is_likely_rider(k)):
+        match = find_best_match_strict(kandidaat)
+        if match and match not in matched:
+            matched.append(match)
+    return matched
+
+
+def _pcs_volgorde(naam: str) -> str:
+    """"Wout Van Aert" → "VAN AERT Wout"; voor de eenvoud is het laatste woord de achternaam."""
+    woorden = naam.split()
+    return f"{woorden[-1].upper()} {' '.join(woorden[:-1])}" if len(woorden) > 1 else naam
+
+
+def _tikfout(naam: str, rng: random.Random) -> str:
+    i = rng.randrange(len(naam))
+    return naam[:i] + naam[i + 1:]
+
+
+def variants(pastes: list, seed: int) -> list:
+    """De pastes zelf plus telkens één verminkte variant per paste."""
+    rng = random.Random(seed)
+    vormen = [
+        lambda r: _pcs_volgorde(r),
+        lambda r: wm.normalize_name(r),
+        lambda r: r.lower(),
+        lambda r: _tikfout(r, rng) if rng.random() < 0.3 else r,
+    ]
+    uit = list(pastes)
+    for paste in pastes:
+        vorm = rng.choice(vormen)
+        regels = [vorm(r) if rng.random() < 0.5 else r for r in paste.split("\n")]
+        regels.insert(rng.randrange(len(regels) + 1), rng.choice(RUIS))
+        uit.append("\n".join(regels))
+    return uit
+
+
+def check_echte_pastes():
+    pool = fixtures.rider_pool(1)
+    all_riders = sorted({wm.pcs_format(r) for namen in fixtures.raw_startlists(pool).values() for r in namen})
+    paste_index = wm.build_paste_index(all_riders)
+    for paste, verwacht in ECHTE_PASTES:
+        oud = legacy_extract(paste, all_riders)
+        nieuw = wm.extract_riders_from_paste(paste, all_riders, paste_index)[0]
+        assert oud == verwacht, f"oude matcher wijkt af van de fixture\n{paste}\n  {oud}"
+        assert nieuw == verwacht, f"VERSCHIL\n{paste}\n  verwacht: {verwacht}\n  nieuw:    {nieuw}"
+    print(f"{len(ECHTE_PASTES)} echte pastes identiek")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plakken: zelfde renners als de vroegere strikte matcher.")
+    parser.add_argument("--scale", type=int, default=1, help="poolgrootte")
+    parser.add_argument("--pastes", type=int, default=100, help="aantal gegenereerde pastes (plus evenveel varianten)")
+    args = parser.parse_args()
+
+    check_echte_pastes()
+    pool = fixtures.rider_pool(args.scale)
+    all_riders = sorted({wm.pcs_format(r) for namen in fixtures.raw_startlists(pool).values() for r in namen})
+    paste_index = wm.build_paste_index(all_riders)
+    pastes = variants(fixtures.team_pastes(pool, args.pastes, seed=args.scale), seed=args.scale)
+
+    t0 = time.perf_counter()
+    oud = [legacy_extract(p, all_riders) for p in pastes]
+    t_oud = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    nieuw = [wm.extract_riders_from_paste(p, all_riders, paste_index)[0] for p in pastes]
+    t_nieuw = time.perf_counter() - t0
+
+    verschillen = [(p, o, n) for p, o, n in zip(pastes, oud, nieuw) if o != n]
+    for paste, o, n in verschillen[:5]:
+        print(f"VERSCHIL\n{paste}\n  oud:   {o}\n  nieuw: {n}")
+    assert not verschillen, f"{len(verschillen)} van {len(pastes)} pastes verschillen"
+    print(f"{len(pastes)} pastes ({len(all_riders)} renners) identiek")
+    print(f"strikte lus: {t_oud * 1000 / len(pastes):8.2f} ms/paste")
+    print(f"plak-index:  {t_nieuw * 1000 / len(pastes):8.2f} ms/paste | x{t_oud / t_nieuw:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: teamdeelname per koers via names_match (oud) vs. de rider-index.
+
+Startlijsten worden opgebouwd uit de X-kolommen van data/dataset.csv, zodat
+er geen netwerk nodig is. Draaien vanuit de repo-root:
+
+    python benchmarks/bench_rider_index.py
+"""
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import wielermanager as wm  # noqa: E402
+
+
+def startlists_from_dataset() -> dict:
+    return wm.dataset_startlists(pd.read_csv(wm.DATASET_PATH))
+
+
+def legacy_membership(team: list, startlists: dict) -> dict:
+    return {
+        race_name: [s for s in team if any(wm.names_match(s, starter) for starter in startlist)]
+        for race_name, startlist in startlists.items()
+    }
+
+
+def indexed_membership(team: list, index: dict) -> dict:
+    selected_ids = {rider: wm.lookup_rider_id(rider, index) for rider in team}
+    return {
+        race_name: [s for s in team if selected_ids[s] in race_ids]
+        for race_name, race_ids in index["races"].items()
+    }
+
+
+def timed(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    random.seed(42)
+    startlists = startlists_from_dataset()
+    all_riders = sorted({r for startlist in startlists.values() for r in startlist})
+
+    t_build, index = timed(wm.build_rider_index, startlists)
+    print(f"index bouwen: {t_build * 1000:.1f} ms ({len(index['ids'])} renners, {len(index['variants'])} rotaties)")
+
+    for n_teams in (1, 10, 100):
+        teams = [random.sample(all_riders, 20) for _ in range(n_teams)]
+        t_old, old = timed(lambda: [legacy_membership(t, startlists) for t in teams], repeat=1 if n_teams > 10 else 3)
+        t_new, new = timed(lambda: [indexed_membership(t, index) for t in teams])
+        assert old == new, "index geeft andere teamdeelname dan names_match"
+        print(f"{n_teams:>4} team(s) x 20 renners: names_match {t_old * 1000:9.1f} ms | "
+              f"index {t_new * 1000:7.2f} ms | x{t_old / max(t_new, 1e-9):,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark: geheugen per extra sessie, vroegere sessiestate vs. het gedeelde
+rennersregister (get_rider_registry).
+
+Vroeger hield elke sessie haar eigen kopie van alle rennersnamen
+(st.cache_data geeft per oproep een kopie) en een eigen plak-index; nu
+enkel haar rider-ID's en de registerversie. Beide varianten dragen dezelfde
+teamevaluatie mee. Gemeten met tracemalloc over N gesimuleerde sessies, na
+het opbouwen van de gedeelde caches.
+
+Daarnaast: hoeveel geheugen blijven de sessies vasthouden nadat het
+register twee keer herbouwd is (nieuwe startlijsten, dus het oude register
+is uit de cache)? Een sessie die het register zelf bewaart, houdt het oude
+register in leven; een sessie met enkel de versie niet.
+
+    python benchmarks/bench_session_memory.py
+    python benchmarks/bench_session_memory.py --scales 1,10 --sessions 50
+"""
+import argparse
+import gc
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+CACHE_DIR = tempfile.mkdtemp(prefix="wm-bench-")
+# Vóór de import van wielermanager: CACHE_DIR wordt bij import vastgelegd
+os.environ["WIELERMANAGER_CACHE_DIR"] = CACHE_DIR
+
+import logging  # noqa: E402
+
+from streamlit import logger as st_logger  # noqa: E402
+
+st_logger.set_log_level(logging.ERROR)
+
+import streamlit as st  # noqa: E402
+
+import fixtures  # noqa: E402
+from fixtures import wm  # noqa: E402
+
+
+def old_session(team: list) -> dict:
+    all_riders = wm.get_all_pcs_riders()
+    participation = wm.get_participation()
+    return {
+        "all_riders": all_riders,
+        "paste_index": wm.build_paste_index(all_riders),
+        "selected_riders": team,
+        "team_evaluation": wm.update_team_evaluation(None, team, participation),
+    }
+
+
+def registry_session(team: list) -> dict:
+    registry = wm.get_rider_registry(False)
+    ids = wm.registry_ids(registry, team)
+    return {
+        "registry_version": registry["version"],
+        "selected_ids": ids,
+        "team_ids": ids,
+        "team_evaluation": wm.update_team_evaluation(
+            None, wm.registry_names(registry, ids), registry["participation"], rider_index=registry["rider_index"]
+        ),
+    }
+
+
+def registry_ref_session(team: list) -> dict:
+    """Zoals registry_session, maar met een verwijzing naar het register zelf."""
+    session = registry_session(team)
+    session["registry"] = wm.get_rider_registry(False)
+    return session
+
+
+def per_session(make_session, teams: list) -> float:
+    """Extra bytes per sessie, nadat een eerste sessie de gedeelde caches opgebouwd heeft."""
+    sessies = [make_session(teams[0])]
+    gc.collect()
+    tracemalloc.start()
+    voor = tracemalloc.get_traced_memory()[0]
+    sessies += [make_session(team) for team in teams]
+    gc.collect()
+    na = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (na - voor) / len(teams)
+
+
+def retained_after_rebuilds(make_session, teams: list, startlists: dict) -> float:
+    """Bytes die de sessies nog vasthouden nadat het register twee keer herbouwd is."""
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    wm.seed_startlist_store(startlists, time.time())
+    gc.collect()
+    tracemalloc.start()
+    sessies = [make_session(team) for team in teams]
+    for i in (1, 2):
+        # Telkens één renner minder in één koers: nieuwe startlijstversie, nieuw register
+        race = sorted(startlists)[i]
+        wm.seed_startlist_store({**startlists, race: startlists[race][i:]}, time.time())
+        wm.get_rider_registry(False)
+    gc.collect()
+    met = tracemalloc.get_traced_memory()[0]
+    del sessies
+    gc.collect()
+    zonder = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return met - zonder
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Geheugen per sessie: oude sessiestate vs. rennersregister.")
+    parser.add_argument("--scales", default="1,10", help="poolgroottes")
+    parser.add_argument("--sessions", type=int, default=20, help="aantal gesimuleerde sessies per meting")
+    args = parser.parse_args()
+
+    try:
+        for scale in (int(s) for s in args.scales.split(",") if s):
+            pool = fixtures.rider_pool(scale)
+            startlists = {race: [wm.pcs_format(r) for r in namen] for race, namen in fixtures.raw_startlists(pool).items()}
+            st.cache_data.clear()
+            st.cache_resource.clear()
+            wm.seed_startlist_store(startlists, time.time())
+            all_riders = wm.get_all_pcs_riders()
+            teams = [wm.extract_riders_from_paste(p, all_riders)[0] for p in fixtures.team_pastes(pool, args.sessions, seed=scale)]
+
+            oud = per_session(old_session, teams)
+            nieuw = per_session(registry_session, teams)
+            print(f"{scale:>3}x ({len(all_riders):>6} renners): "
+                  f"oud {oud / 1024:9.1f} KiB/sessie | register {nieuw / 1024:9.1f} KiB/sessie | x{oud / nieuw:.1f}")
+            verwijzing = retained_after_rebuilds(registry_ref_session, teams, startlists)
+            versie = retained_after_rebuilds(registry_session, teams, startlists)
+            print(f"{scale:>3}x na 2 herbouwingen vastgehouden door {len(teams)} sessies: "
+                  f"met register {verwijzing / 1024:9.1f} KiB | enkel versie {versie / 1024:9.1f} KiB")
+    finally:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
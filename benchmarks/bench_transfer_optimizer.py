@@ -0,0 +1,78 @@
+"""
+Benchmark: solve_transfers voor 1, 2 en 3 transfers over de ~900 renners uit
+data/dataset.csv (deelnames en prijzen), met een willekeurig team van 20.
+Voor kleine kandidatenlijsten wordt het resultaat ook tegen brute force gecontroleerd.
+
+    python benchmarks/bench_transfer_optimizer.py
+"""
+import itertools
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import wielermanager as wm  # noqa: E402
+
+
+def load_problem(seed: int, n_candidates: int = 1000):
+    """Team van 20 en n_candidates kandidaten; echte renners uit dataset.csv, aangevuld met varianten."""
+    dataset = pd.read_csv(wm.DATASET_PATH)
+    participation = wm.build_participation({}, wm.dataset_startlists(dataset))
+    values = wm.rider_values(dataset)
+    matrix = participation["matrix"].join(values, how="inner")
+    deelname = matrix[participation["matrix"].columns].to_numpy(dtype=float)
+    prijzen = matrix["prijs"].to_numpy()
+    rng = np.random.default_rng(seed)
+    team_rijen = rng.choice(len(matrix), 20, replace=False)
+    echte = np.setdiff1d(np.arange(len(matrix)), team_rijen)
+    extra = rng.choice(echte, max(0, n_candidates - len(echte)))
+    flips = rng.random((len(extra), deelname.shape[1])) < 0.1
+    candidates = np.vstack([deelname[echte], np.abs(deelname[extra] - flips)])
+    candidate_cost = np.concatenate([prijzen[echte], prijzen[extra]])
+    return deelname[team_rijen], prijzen[team_rijen], candidates, candidate_cost
+
+
+def brute_force(team, team_cost, candidates, candidate_cost, race_weights, k, budget):
+    beste = -np.inf
+    for uit in itertools.combinations(range(len(team)), k):
+        base = np.delete(team, uit, axis=0)
+        for in_ in itertools.combinations(range(len(candidates)), k):
+            if candidate_cost[list(in_)].sum() - team_cost[list(uit)].sum() > budget:
+                continue
+            beste = max(beste, wm._coverage(np.vstack([base, candidates[list(in_)]]), race_weights, wm.OPSTELLING))
+    return beste
+
+
+def main():
+    budget = 3.0
+    for seed in range(3):
+        team, team_cost, candidates, candidate_cost = load_problem(seed)
+        race_weights = np.ones(team.shape[1])
+
+        # Exactheid: brute force op een kleine kandidatenlijst
+        klein = slice(0, 40)
+        for k in (1, 2):
+            # solve_transfers zoekt over 1..k transfers
+            verwacht = max(brute_force(team, team_cost, candidates[klein], candidate_cost[klein], race_weights, j, budget)
+                           for j in range(1, k + 1))
+            gevonden = wm.solve_transfers(team, team_cost, candidates[klein], candidate_cost[klein],
+                                          race_weights, k, budget, top_n=1)
+            assert abs(gevonden[0][0] - verwacht) < 1e-9, (k, verwacht, gevonden)
+
+        print(f"seed {seed}: {len(candidates)} kandidaten, team-dekking "
+              f"{wm._coverage(team, race_weights, wm.OPSTELLING):.0f}")
+        for k in (1, 2, 3):
+            t0 = time.perf_counter()
+            oplossingen = wm.solve_transfers(team, team_cost, candidates, candidate_cost, race_weights, k, budget)
+            duur = time.perf_counter() - t0
+            beste = oplossingen[0][0] if oplossingen else float("nan")
+            print(f"  max {k} transfer(s): {duur * 1000:8.1f} ms | beste dekking {beste:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark: what_if_transfers, alle ruilsets tegelijk als matrixbewerkingen.
+
+Rekent een steekproef van scenario's apart na via team_schedule (zelfde
+counts, aantal zwak bezette koersen en kost) en meet de tijd per rerun,
+inclusief alle rangschikkingen, voor 1, 2 en 3 ruilen tegelijk.
+
+    python benchmarks/bench_what_if.py
+    python benchmarks/bench_what_if.py --scales 1,10 --teams 5
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+CACHE_DIR = tempfile.mkdtemp(prefix="wm-bench-")
+# Vóór de import van wielermanager: CACHE_DIR wordt bij import vastgelegd
+os.environ["WIELERMANAGER_CACHE_DIR"] = CACHE_DIR
+
+import logging  # noqa: E402
+
+from streamlit import logger as st_logger  # noqa: E402
+
+st_logger.set_log_level(logging.ERROR)
+
+import numpy as np  # noqa: E402
+import streamlit as st  # noqa: E402
+
+import fixtures  # noqa: E402
+from fixtures import wm  # noqa: E402
+
+SEIZOENSSTART = "2026-02-01 12:00"    # alle koersen nog te rijden
+
+
+def reference(registry: dict, result: dict, scenario: int) -> tuple:
+    """Eén scenario apart doorgerekend via team_schedule."""
+    namen = registry["names"]
+    team = [namen[i] for i in result["team_ids"]]
+    uit = {team[i] for i in result["uit"][scenario] if i >= 0}
+    in_ = [namen[result["candidate_ids"][i]] for i in result["in"][scenario] if i >= 0]
+    schema = wm.team_schedule([r for r in team if r not in uit] + in_, registry["participation"], registry["rider_index"])
+    counts = schema[result["races"]].sum(axis=0).to_numpy()
+    prijzen = {namen[i]: p for i, p in enumerate(registry["price"])}
+    kost = sum(prijzen[r] for r in in_) - sum(np.nan_to_num(prijzen[r]) for r in uit)
+    return counts, int((counts <= wm.ZWAK_BEZET).sum()), kost
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wat-als-simulator: doorvoer en correctheid.")
+    parser.add_argument("--scales", default="1,10", help="poolgroottes")
+    parser.add_argument("--teams", type=int, default=3, help="aantal teams per schaal")
+    parser.add_argument("--checks", type=int, default=200, help="steekproef van scenario's om na te rekenen")
+    args = parser.parse_args()
+    now = wm.race_start_timestamp(SEIZOENSSTART)
+
+    try:
+        for scale in (int(s) for s in args.scales.split(",") if s):
+            pool = fixtures.rider_pool(scale)
+            startlists = {race: [wm.pcs_format(r) for r in namen] for race, namen in fixtures.raw_startlists(pool).items()}
+            st.cache_data.clear()
+            st.cache_resource.clear()
+            wm.seed_startlist_store(startlists, time.time())
+            registry = wm.get_rider_registry(False)
+            rng = random.Random(scale)
+            for t in range(args.teams):
+                team_ids = rng.sample(range(len(registry["names"])), 20)
+                for k in (1, 2, 3):
+                    t0 = time.perf_counter()
+                    result = wm.what_if_transfers(team_ids, range(len(registry["names"])), registry, k, now=now)
+                    for ranking in wm.WHATIF_RANKING:
+                        wm.rank_what_if(result, ranking, budget=0.0)
+                    duur = time.perf_counter() - t0
+                    if t == 0:
+                        for scenario in rng.sample(range(len(result["zwak"])), min(args.checks, len(result["zwak"]))):
+                            counts, zwak, kost = reference(registry, result, scenario)
+                            assert np.array_equal(counts, result["counts"][scenario]), scenario
+                            assert zwak == result["zwak"][scenario], scenario
+                            assert np.isclose(kost, result["kost"][scenario], equal_nan=True), scenario
+                    print(f"{scale:>3}x team {t} k={k}: {len(result['zwak']):>7} scenario's over "
+                          f"{len(result['candidate_ids']):>5} kandidaten (pools {result['pools']}) in {duur * 1000:7.1f} ms "
+                          f"({len(result['zwak']) / duur / 1e6:.1f} M/s)")
+            print(f"{scale:>3}x: steekproef identiek aan de referentie")
+    finally:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Fixtures voor de benchmarks: synthetische rennerspools en team-pastes, en een
+fixture-map met PCS-pagina's en Datawrapper-versies voor server.py.
+
+De fixture-map volgt de URL-paden: /race/<koers>/2026/startlist staat in
+<map>/race/<koers>/2026/startlist.html, /dgT0d/<versie>/dataset.csv in
+<map>/dgT0d/<versie>/dataset.csv. Zo kunnen opgenomen echte pagina's
+(--record) en gegenereerde pagina's door elkaar gebruikt worden.
+
+    python benchmarks/fixtures.py generate fixtures/ --scale 1
+    python benchmarks/fixtures.py record fixtures/
+"""
+import argparse
+import html
+import os
+import random
+import string
+import sys
+from urllib.parse import urlparse
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import wielermanager as wm  # noqa: E402
+
+DATAWRAPPER_VERSIONS = 5
+
+
+def _suffix(n: int) -> str:
+    """0 → "", 1 → "A", 27 → "AA": alfabetisch, want normalize_name schrapt cijfers."""
+    letters = ""
+    while n > 0:
+        n, rest = divmod(n - 1, 26)
+        letters = string.ascii_uppercase[rest] + letters
+    return letters
+
+
+def rider_pool(scale: int = 1) -> pd.DataFrame:
+    """
+    Rennerspool in het formaat van dataset.csv (Renner in PCS-formaat, €, X-kolommen).
+    Bij scale > 1 komen er kopieën bij met een afgeleide achternaam en licht
+    geschudde koersdeelnames, zodat elke renner uniek blijft.
+    """
+    base = pd.read_csv(wm.DATASET_PATH).dropna(subset=["Renner", "€"])
+    codes = [c for c in wm.DATASET_RACE_CODES if c in base.columns]
+    rng = random.Random(scale)
+    kopieen = [base]
+    for n in range(1, scale):
+        kopie = base.copy()
+        kopie["Renner"] = [
+            f"{r.split(' ', 1)[0]}{_suffix(n)} {r.split(' ', 1)[1]}" if " " in r else f"{r}{_suffix(n)}"
+            for r in base["Renner"]
+        ]
+        for code in codes:
+            kopie[code] = [("X" if rng.random() < 0.2 else None) if rng.random() < 0.1 else v for v in kopie[code]]
+        kopieen.append(kopie)
+    return pd.concat(kopieen, ignore_index=True)
+
+
+def raw_startlists(pool: pd.DataFrame) -> dict:
+    """koers → rennersnamen zoals PCS ze toont ("WELLENS Tim")."""
+    return {
+        race_name: list(pool.loc[pool[code].astype(str).str.strip() == "X", "Renner"])
+        for code, race_name in wm.DATASET_RACE_CODES.items()
+        if code in pool.columns
+    }
+
+
+def team_pastes(pool: pd.DataFrame, n_teams: int, seed: int = 0, team_size: int = 20) -> list:
+    """Geplakte "Mijn renners"-teksten: per renner naam, ploeg en prijs, zoals op de site."""
+    rng = random.Random(seed)
+    rijen = list(zip(pool["Renner"], pool["Team"].fillna(""), pool["€"]))
+    pastes = []
+    for _ in range(n_teams):
+        regels = ["Mijn ploeg", "Budget: 2,5M resterend"]
+        for renner, ploeg, prijs in rng.sample(rijen, team_size):
+            regels += [wm.pcs_format(renner), ploeg, f"€ {prijs:.1f}M".replace(".", ",")]
+        pastes.append("\n".join(regels))
+    return pastes
+
+
+def render_startlist_page(raw_names: list, teams: list) -> str:
+    """PCS-achtige startlist-pagina (ul.startlist_v4) met wat navigatie errond."""
+    nav = "".join(f'<li><a href="/race/{i}">Koers {i}</a></li>' for i in range(40))
+    blokken = []
+    per_team = {}
+    for naam, ploeg in zip(raw_names, teams):
+        per_team.setdefault(ploeg or "Onbekend", []).append(naam)
+    for ploeg, namen in per_team.items():
+        renners = "".join(
+            f'<li><span class="bib">{i}</span><a href="rider/{html.escape(n.lower().replace(" ", "-"))}">{html.escape(n)}</a></li>'
+            for i, n in enumerate(namen, 1)
+        )
+        blokken.append(f'<li><div class="ridersCont"><a class="team" href="team/x">{html.escape(ploeg)}</a><ul>{renners}</ul></div></li>')
+    return (
+        f"<html><head><title>Startlist</title></head><body><div class=\"menu\"><ul>{nav}</ul></div>"
+        f"<div class=\"page-content\"><ul class=\"startlist_v4\">{''.join(blokken)}</ul></div>"
+        f"<div class=\"footer\">{'<p>footer</p>' * 50}</div></body></html>"
+    )
+
+
+def render_result_page(raw_names: list) -> str:
+    """PCS-achtige uitslagpagina: geen startlist_v4, enkel /rider/-links in een tabel."""
+    rijen = "".join(
+        f'<tr><td>{i}</td><td><a href="/rider/{html.escape(n.lower().replace(" ", "-"))}">{html.escape(n)}</a></td></tr>'
+        for i, n in enumerate(raw_names, 1)
+    )
+    return f"<html><body><table class=\"results\">{rijen}</table></body></html>"
+
+
+def fixture_path(fixture_dir: str, url: str) -> str:
+    path = urlparse(url).path.lstrip("/")
+    if not os.path.splitext(path)[1]:
+        path += ".html"
+    return os.path.join(fixture_dir, *path.split("/"))
+
+
+def _write(path: str, text: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def write_fixture_dir(fixture_dir: str, scale: int = 1, versions: int = DATAWRAPPER_VERSIONS) -> pd.DataFrame:
+    """
+    Genereert de fixture-map voor een pool van de gegeven schaal. Elke vierde koers
+    heeft enkel een uitslagpagina, zodat ook de fallback-URLs gebruikt worden.
+    """
+    pool = rider_pool(scale)
+    ploegen = dict(zip(pool["Renner"], pool["Team"].fillna("")))
+    for i, (race_name, namen) in enumerate(raw_startlists(pool).items()):
+        startlist_url = wm.PCS_URLS[race_name]
+        if i % 4 == 3:
+            _write(fixture_path(fixture_dir, startlist_url.replace("/startlist", "/result")), render_result_page(namen))
+        else:
+            _write(fixture_path(fixture_dir, startlist_url), render_startlist_page(namen, [ploegen[n] for n in namen]))
+    csv = pool.to_csv(index=False)
+    for version in range(1, versions + 1):
+        _write(fixture_path(fixture_dir, f"{wm.PRIJZEN_BASE_URL}/{version}/dataset.csv"), csv)
+    return pool
+
+
+def record_fixtures(fixture_dir: str):
+    """Neemt de echte PCS-pagina's en Datawrapper-versies op (vereist netwerk)."""
+    for race_name in wm.PCS_URLS:
+        for url in wm.pcs_candidate_urls(race_name):
+            r = wm.req.get(url, headers=wm.PCS_HEADERS, timeout=wm.PCS_TIMEOUT)
+            if r.status_code == 200:
+                _write(fixture_path(fixture_dir, url), r.text)
+    for version in range(1, wm.PRIJZEN_MAX_VERSION + 1):
+        url = f"{wm.PRIJZEN_BASE_URL}/{version}/dataset.csv"
+        r = wm.req.get(url, timeout=wm.PRIJZEN_TIMEOUT)
+        if r.status_code == 200:
+            _write(fixture_path(fixture_dir, url), r.text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maak of neem benchmark-fixtures op.")
+    parser.add_argument("mode", choices=["generate", "record"])
+    parser.add_argument("fixture_dir")
+    parser.add_argument("--scale", type=int, default=1)
+    args = parser.parse_args()
+    if args.mode == "generate":
+        write_fixture_dir(args.fixture_dir, args.scale)
+    else:
+        record_fixtures(args.fixture_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Offline benchmarksuite: tijdt de hete paden van de app tegen een lokale
+fixture-server (zie server.py) en synthetische pools van 1x, 10x en 100x
+de huidige grootte (zie fixtures.py). Resultaten gaan als JSON naar
+benchmarks/results/, zodat runs met elkaar vergeleken kunnen worden.
+
+    python benchmarks/run.py
+    python benchmarks/run.py --latency 0.05 --failure-rate 0.02 --scales 1,10
+    python benchmarks/run.py --compare benchmarks/results/a.json benchmarks/results/b.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+CACHE_DIR = tempfile.mkdtemp(prefix="wm-bench-")
+# Vóór de import van wielermanager: CACHE_DIR wordt bij import vastgelegd
+os.environ["WIELERMANAGER_CACHE_DIR"] = CACHE_DIR
+
+import logging  # noqa: E402
+
+from streamlit import logger as st_logger  # noqa: E402
+
+st_logger.set_log_level(logging.ERROR)
+
+import streamlit as st  # noqa: E402
+
+import fixtures  # noqa: E402
+from fixtures import wm  # noqa: E402
+from server import FixtureServer  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+PCS_ORIGIN = "https://www.procyclingstats.com"
+SEIZOENSSTART = "2026-02-01 12:00"    # 'nu' voor fetch_data: alle koersen nog te rijden
+ORIGINELE_PCS_URLS = dict(wm.PCS_URLS)
+ORIGINELE_PRIJZEN_BASE_URL = wm.PRIJZEN_BASE_URL
+
+
+def _timed(fn, repeat: int, setup=None) -> dict:
+    tijden = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        tijden.append(time.perf_counter() - t0)
+    return {"runs": tijden, "median": statistics.median(tijden), "min": min(tijden)}
+
+
+def _reset_cache(*bestanden):
+    wm.wait_for_prijzen_revalidation()
+    st.cache_data.clear()
+    for pad in bestanden:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(pad + suffix):
+                os.remove(pad + suffix)
+
+
+def _point_at(base_url: str):
+    wm.PCS_URLS = {race: url.replace(PCS_ORIGIN, base_url) for race, url in ORIGINELE_PCS_URLS.items()}
+    wm.PRIJZEN_BASE_URL = ORIGINELE_PRIJZEN_BASE_URL.replace("https://datawrapper.dwcdn.net", base_url)
+
+
+def _all_pcs_riders() -> list:
+    # Zoals bij een koude start: ontbrekende koersen eerst scrapen (de versie zelf scrapet nooit)
+    wm.load_startlists()
+    return wm.get_all_pcs_riders()
+
+
+def network_scenarios(scale: int, args) -> list:
+    """get_all_pcs_riders en load_prijzen_csv tegen de fixture-server, koud en warm."""
+    fixture_dir = tempfile.mkdtemp(prefix=f"wm-fixtures-{scale}x-")
+    try:
+        fixtures.write_fixture_dir(fixture_dir, scale)
+        with FixtureServer(fixture_dir, args.latency, args.jitter, args.failure_rate, seed=scale) as server:
+            _point_at(server.base_url)
+            resultaten = []
+            for naam, fn, bestanden in (
+                ("get_all_pcs_riders", _all_pcs_riders, (wm.STARTLIST_DB,)),
+                ("load_prijzen_csv", wm.load_prijzen_csv, (wm.PRIJZEN_CACHE_CSV, wm.PRIJZEN_CACHE_META)),
+            ):
+                for fase, reset in (("koud", lambda b=bestanden: _reset_cache(*b)), ("warm", _reset_cache)):
+                    voor = server.requests
+                    meting = _timed(fn, args.repeat, setup=reset)
+                    # Requests van de achtergrondrevalidatie tellen mee, de wachttijd niet
+                    wm.wait_for_prijzen_revalidation()
+                    meting["requests"] = (server.requests - voor) / args.repeat
+                    resultaten.append({"scenario": f"{naam} ({fase})", "scale": scale, **meting})
+            return resultaten
+    finally:
+        shutil.rmtree(fixture_dir, ignore_errors=True)
+        _reset_cache(wm.STARTLIST_DB, wm.PRIJZEN_CACHE_CSV, wm.PRIJZEN_CACHE_META)
+
+
+def memory_scenarios(scale: int, args) -> list:
+    """Plakken, teamevaluatie en prijzen op een synthetische pool; geen netwerk."""
+    pool = fixtures.rider_pool(scale)
+    startlists = {race: [wm.pcs_format(r) for r in namen] for race, namen in fixtures.raw_startlists(pool).items()}
+    _reset_cache(wm.STARTLIST_DB)
+    wm.seed_startlist_store(startlists, time.time())
+    all_riders = wm.get_all_pcs_riders()
+    paste_index = wm.build_paste_index(all_riders)
+    pastes = fixtures.team_pastes(pool, args.teams, seed=scale)
+    teams = [wm.extract_riders_from_paste(p, all_riders, paste_index)[0] for p in pastes]
+    now = wm.race_start_timestamp(SEIZOENSSTART)
+
+    prijzen = pool[["Renner", "€"]].copy()
+    prijzen["Renner"] = prijzen["Renner"].map(wm.pcs_format)
+    rng = random.Random(scale)
+    # Een deel van de namen licht verminkt, zodat ook de fuzzy fallback meetelt
+    namen = [n if rng.random() < 0.8 else n[:-1] for team in teams for n in team]
+
+    resultaten = []
+
+    def meet(naam, fn, **kwargs):
+        meting = _timed(fn, args.repeat, **kwargs)
+        resultaten.append({"scenario": naam, "scale": scale, "pool": len(all_riders), **meting})
+
+    meet("extract_riders_from_paste", lambda: [wm.extract_riders_from_paste(p, all_riders, paste_index) for p in pastes])
+    meet("fetch_data (koud)", lambda: wm.fetch_data(teams[0], now=now), setup=st.cache_data.clear)
+    meet("fetch_data", lambda: [wm.fetch_data(team, now=now) for team in teams])
+    price_index = wm.build_price_index(prijzen)
+    meet("build_price_index", lambda: wm.build_price_index(prijzen))
+    meet("get_rider_price", lambda: [wm.get_rider_price(n, price_index) for n in namen])
+    meet("get_rider_prices", lambda: wm.get_rider_prices(namen, price_index))
+    _reset_cache(wm.STARTLIST_DB)
+    return resultaten
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=fixtures.ROOT, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(oud_pad: str, nieuw_pad: str):
+    with open(oud_pad, encoding="utf-8") as f:
+        oud = {(r["scenario"], r["scale"]): r["median"] for r in json.load(f)["results"]}
+    with open(nieuw_pad, encoding="utf-8") as f:
+        nieuw = json.load(f)["results"]
+    for r in nieuw:
+        sleutel = (r["scenario"], r["scale"])
+        vorige = oud.get(sleutel)
+        verschil = f"x{vorige / r['median']:.2f}" if vorige and r["median"] else "nieuw"
+        print(f"{r['scenario']:<32} {r['scale']:>4}x  {r['median'] * 1000:10.1f} ms  {verschil}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks van de hete paden.")
+    parser.add_argument("--scales", default="1,10,100", help="poolgroottes voor de in-memory scenario's")
+    parser.add_argument("--network-scales", default="1,10", help="poolgroottes voor de server-scenario's")
+    parser.add_argument("--teams", type=int, default=50, help="aantal team-pastes per schaal")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconden per request")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("-o", "--output", help="JSON-uitvoer (standaard: benchmarks/results/<tijd>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OUD", "NIEUW"), help="vergelijk twee resultaatbestanden")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    resultaten = []
+    try:
+        for scale in (int(s) for s in args.network_scales.split(",") if s):
+            resultaten += network_scenarios(scale, args)
+        for scale in (int(s) for s in args.scales.split(",") if s):
+            resultaten += memory_scenarios(scale, args)
+    finally:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+    for r in resultaten:
+        extra = f" | {r['requests']:.0f} requests" if "requests" in r else ""
+        print(f"{r['scenario']:<32} {r['scale']:>4}x  {r['median'] * 1000:10.1f} ms{extra}")
+
+    uitvoer = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(uitvoer)), exist_ok=True)
+    with open(uitvoer, "w", encoding="utf-8") as f:
+        json.dump({
+            "meta": {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "commit": _git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "params": vars(args),
+            },
+            "results": resultaten,
+        }, f, indent=2)
+    print(f"→ {uitvoer}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Lokale stand-in voor ProCyclingStats en Datawrapper: serveert een fixture-map
+(zie fixtures.py) met instelbare latency en foutkans, en ondersteunt
+ETag/If-None-Match zoals de Datawrapper-CDN.
+
+    python benchmarks/server.py fixtures/ --port 8800 --latency 0.2 --failure-rate 0.05
+"""
+import argparse
+import hashlib
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+
+class FixtureServer:
+    """Draait in een achtergrondthread; gebruik als context manager en lees base_url."""
+
+    def __init__(self, fixture_dir: str, latency: float = 0.0, jitter: float = 0.0,
+                 failure_rate: float = 0.0, port: int = 0, seed: int = 0):
+        self.fixture_dir = fixture_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_HEAD(self):
+                self.do_GET(body=False)
+
+            def do_GET(self, body=True):
+                with server._lock:
+                    server.requests += 1
+                    vertraging = server.latency + server._rng.uniform(0, server.jitter)
+                    faalt = server._rng.random() < server.failure_rate
+                if vertraging:
+                    time.sleep(vertraging)
+                if faalt:
+                    self.send_error(503)
+                    return
+                path = urlparse(self.path).path.lstrip("/")
+                if not os.path.splitext(path)[1]:
+                    path += ".html"
+                bestand = os.path.join(server.fixture_dir, *path.split("/"))
+                if not os.path.isfile(bestand):
+                    self.send_error(404)
+                    return
+                with open(bestand, "rb") as f:
+                    inhoud = f.read()
+                etag = f'"{hashlib.md5(inhoud).hexdigest()}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/csv" if bestand.endswith(".csv") else "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(inhoud)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                if not body:
+                    return
+                try:
+                    self.wfile.write(inhoud)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass    # de client sloot de verbinding al (bv. een probe die enkel de status wil)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveer benchmark-fixtures lokaal.")
+    parser.add_argument("fixture_dir")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconden per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra willekeurige latency (max, seconden)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="kans op een 503 per request")
+    args = parser.parse_args()
+    with FixtureServer(args.fixture_dir, args.latency, args.jitter, args.failure_rate, args.port) as server:
+        print(f"Fixtures op {server.base_url} (Ctrl+C om te stoppen)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,437 @@
 import streamlit as st
 import pandas as pd
-from bs4 import BeautifulSoup
+import numpy as np
 import unicodedata
 import re
 import os
+import sys
 import io
 import requests as req
-from rapidfuzz import process
+from rapidfuzz import process, fuzz
 from datetime import datetime
 import pytz
 import base64
+import functools
+import heapq
+import itertools
+import math
+import json
+import hashlib
+import sqlite3
+import time
+import random
+import socket
+import uuid
+import threading
+import collections
+import contextlib
+from contextlib import closing
+from urllib.parse import urlparse
+from html.parser import HTMLParser
+import asyncio
+import aiohttp
+try:
+    import pyarrow as pa
+except ImportError:     # optioneel: zonder pyarrow geen Arrow-snapshots, dan telkens parsen
+    pa = None
+import concurrent.futures
+from concurrent.futures import ThreadPoolExecutor
+
+# ── Instrumentatie ────────────────────────────────────────────────────────────
+METRICS_MAX_FETCHES = 200   # zoveel recente URL-pogingen en scrapes worden bijgehouden
+METRICS_PREFIX = "wielermanager"
+# Optioneel: de achtergrondplanner schrijft hier periodiek de Prometheus-tekst naartoe
+# (bv. voor de textfile collector van node_exporter)
+METRICS_FILE = os.environ.get("WIELERMANAGER_METRICS_FILE")
+
+@st.cache_resource
+def _metrics_store() -> tuple:
+    """Eén store per proces: Streamlit voert het script bij elke interactie opnieuw uit."""
+    return threading.Lock(), {
+        "stages": {},       # stap → {"count", "total", "max", "last"} in seconden
+        "events": {},       # (naam, labels) → aantal
+        "caches": {},       # functie → {"calls", "misses"}
+        "http": {},         # (host, status) → {"count", "seconds", "bytes"}
+        "fetches": collections.deque(maxlen=METRICS_MAX_FETCHES),
+        "scrapes": collections.deque(maxlen=METRICS_MAX_FETCHES),
+    }
+
+_metrics_lock, _metrics = _metrics_store()
+
+def record_stage(name: str, seconds: float):
+    with _metrics_lock:
+        stage = _metrics["stages"].get(name)
+        if stage is None:
+            stage = _metrics["stages"][name] = {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0}
+        stage["count"] += 1
+        stage["total"] += seconds
+        stage["max"] = max(stage["max"], seconds)
+        stage["last"] = seconds
+
+@contextlib.contextmanager
+def timed_stage(name: str):
+    """Meet de wandkloktijd van een stap; bruikbaar als `with` en als decorator."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - t0)
+
+def count_event(name: str, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with _metrics_lock:
+        _metrics["events"][key] = _metrics["events"].get(key, 0) + 1
+
+def record_fetch(url: str, status, seconds: float, size: int = 0):
+    """Eén HTTP-poging; status is de HTTP-status of de naam van de exception."""
+    host = urlparse(url).netloc
+    with _metrics_lock:
+        http = _metrics["http"].get((host, str(status)))
+        if http is None:
+            http = _metrics["http"][(host, str(status))] = {"count": 0, "seconds": 0.0, "bytes": 0}
+        http["count"] += 1
+        http["seconds"] += seconds
+        http["bytes"] += size
+        _metrics["fetches"].append({
+            "time": time.time(), "url": url, "status": status,
+            "ms": round(seconds * 1000, 1), "bytes": size,
+        })
+
+def record_scrape(race_name: str, url, fallback, selector, riders: int):
+    """Resultaat van één koers-scrape: welke URL (0 = startlist) en welke selector lukte."""
+    count_event("pcs_scrape", fallback=str(fallback), selector=str(selector))
+    with _metrics_lock:
+        _metrics["scrapes"].append({
+            "time": time.time(), "race": race_name, "url": url,
+            "fallback": fallback, "selector": selector, "riders": riders,
+        })
+
+def _count_cache(name: str, field: str):
+    with _metrics_lock:
+        cache = _metrics["caches"].get(name)
+        if cache is None:
+            cache = _metrics["caches"][name] = {"calls": 0, "misses": 0}
+        cache[field] += 1
+
+def cached_data(func=None, **cache_kwargs):
+    """st.cache_data die per functie oproepen en misses telt (hits = oproepen - misses)."""
+    def decorate(fn):
+        name = fn.__name__
+
+        @functools.wraps(fn)
+        def compute(*args, **kwargs):
+            _count_cache(name, "misses")
+            return fn(*args, **kwargs)
+        cached = st.cache_data(**cache_kwargs)(compute)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            _count_cache(name, "calls")
+            return cached(*args, **kwargs)
+        wrapper.clear = cached.clear
+        return wrapper
+    return decorate(func) if func is not None else decorate
+
+def reset_metrics():
+    with _metrics_lock:
+        for value in _metrics.values():
+            value.clear()
+
+def metrics_snapshot() -> dict:
+    """Kopie van alle metingen, JSON-serialiseerbaar."""
+    with _metrics_lock:
+        return {
+            "time": time.time(),
+            "stages": {name: dict(stage) for name, stage in _metrics["stages"].items()},
+            "events": [{"name": name, "labels": dict(labels), "count": n}
+                       for (name, labels), n in _metrics["events"].items()],
+            "caches": {name: {**cache, "hits": cache["calls"] - cache["misses"]}
+                       for name, cache in _metrics["caches"].items()},
+            "http": [{"host": host, "status": status, **http} for (host, status), http in _metrics["http"].items()],
+            "fetches": list(_metrics["fetches"]),
+            "scrapes": list(_metrics["scrapes"]),
+        }
+
+def _prom_escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _prom_labels(**labels) -> str:
+    return "{" + ",".join(f'{k}="{_prom_escape(v)}"' for k, v in labels.items()) + "}"
+
+def metrics_prometheus() -> str:
+    """Alle metingen in het Prometheus text exposition format."""
+    snap = metrics_snapshot()
+    p = METRICS_PREFIX
+    lines = [f"# TYPE {p}_stage_seconds summary"]
+    for name, stage in snap["stages"].items():
+        lines.append(f"{p}_stage_seconds_count{_prom_labels(stage=name)} {stage['count']}")
+        lines.append(f"{p}_stage_seconds_sum{_prom_labels(stage=name)} {stage['total']:.6f}")
+    lines.append(f"# TYPE {p}_stage_seconds_max gauge")
+    for name, stage in snap["stages"].items():
+        lines.append(f"{p}_stage_seconds_max{_prom_labels(stage=name)} {stage['max']:.6f}")
+    lines.append(f"# TYPE {p}_cache_requests_total counter")
+    for name, cache in snap["caches"].items():
+        lines.append(f"{p}_cache_requests_total{_prom_labels(function=name, result='hit')} {cache['hits']}")
+        lines.append(f"{p}_cache_requests_total{_prom_labels(function=name, result='miss')} {cache['misses']}")
+    lines.append(f"# TYPE {p}_http_requests_total counter")
+    for http in snap["http"]:
+        lines.append(f"{p}_http_requests_total{_prom_labels(host=http['host'], status=http['status'])} {http['count']}")
+    lines.append(f"# TYPE {p}_http_request_seconds_total counter")
+    for http in snap["http"]:
+        lines.append(f"{p}_http_request_seconds_total{_prom_labels(host=http['host'], status=http['status'])} {http['seconds']:.6f}")
+    lines.append(f"# TYPE {p}_http_response_bytes_total counter")
+    for http in snap["http"]:
+        lines.append(f"{p}_http_response_bytes_total{_prom_labels(host=http['host'], status=http['status'])} {http['bytes']}")
+    lines.append(f"# TYPE {p}_events_total counter")
+    for event in snap["events"]:
+        lines.append(f"{p}_events_total{_prom_labels(event=event['name'], **event['labels'])} {event['count']}")
+    return "\n".join(lines) + "\n"
+
+def render_metrics_panel():
+    """Opt-in prestatiepaneel in de sidebar."""
+    snap = metrics_snapshot()
+    sidebar = st.sidebar
+    sidebar.subheader("⏱️ Prestatiediagnose")
+    if snap["stages"]:
+        sidebar.caption("Stappen (wandkloktijd in ms)")
+        sidebar.dataframe(pd.DataFrame([
+            {
+                "Stap": name,
+                "Aantal": stage["count"],
+                "Totaal": round(stage["total"] * 1000, 1),
+                "Gemiddeld": round(stage["total"] / stage["count"] * 1000, 2),
+                "Max": round(stage["max"] * 1000, 1),
+                "Laatste": round(stage["last"] * 1000, 2),
+            }
+            for name, stage in sorted(snap["stages"].items(), key=lambda x: x[1]["total"], reverse=True)
+        ]).set_index("Stap"))
+    if snap["caches"]:
+        sidebar.caption("Caches")
+        sidebar.dataframe(pd.DataFrame([
+            {
+                "Functie": name,
+                "Oproepen": cache["calls"],
+                "Hits": cache["hits"],
+                "Misses": cache["misses"],
+                "Hit-ratio": f"{cache['hits'] / cache['calls']:.0%}" if cache["calls"] else "-",
+            }
+            for name, cache in sorted(snap["caches"].items())
+        ]).set_index("Functie"))
+    if snap["fetches"]:
+        sidebar.caption("Laatste URL-pogingen")
+        sidebar.dataframe(pd.DataFrame(snap["fetches"][-20:][::-1]).drop(columns=["time"]))
+    if snap["scrapes"]:
+        sidebar.caption("Laatste scrapes (fallback 0 = startlist-pagina)")
+        sidebar.dataframe(pd.DataFrame(snap["scrapes"][-20:][::-1]).drop(columns=["time"]))
+    sidebar.download_button("📥 JSON", json.dumps(snap, indent=2, default=str),
+                            file_name="wielermanager-metrics.json", mime="application/json")
+    sidebar.download_button("📥 Prometheus", metrics_prometheus(),
+                            file_name="wielermanager-metrics.prom", mime="text/plain")
+    if sidebar.button("Metingen wissen"):
+        reset_metrics()
+
+# ── HTTP-client ───────────────────────────────────────────────────────────────
+# Alle uitgaande requests delen per host: een keep-alive sessie, een token bucket
+# en een circuit breaker. Zo wordt een hapering bij PCS geen reeks verspilde
+# timeouts of een burst die ons laat rate-limiten.
+#
+# Afweging bij de limieten: een koude scrape vraagt één pagina per koers (~19) en
+# enkel een fallback-URL als die faalt of leeg is; met de fallbacks van nog niet
+# gepubliceerde startlijsten samen ~19–27 requests. Dat past (bijna) in de burst,
+# de rest gaat aan het vaste tempo: hooguit een paar honderd ms extra, ook als de
+# server meteen antwoordt. Tegen het echte PCS weegt dat weinig t.o.v. de
+# netwerktijd en het voorkomt 429's.
+# Overschrijven kan per host met WIELERMANAGER_HTTP_RATE_LIMITS, bv.
+# "www.procyclingstats.com=50:100,*=100:200" ("*" = alle andere hosts).
+HTTP_RATE_LIMITS = {                # host → (requests per seconde, burst)
+    "www.procyclingstats.com": (8.0, 24),
+    "datawrapper.dwcdn.net": (20.0, 40),
+}
+HTTP_DEFAULT_RATE_LIMIT = (10.0, 20)
+
+def parse_rate_limits(spec: str) -> dict:
+    """"host=rate:burst,..." → {host: (rate, burst)}; ongeldige of niet-positieve items vallen weg."""
+    limits = {}
+    for item in (spec or "").split(","):
+        host, _, waarde = item.strip().partition("=")
+        rate, _, burst = waarde.partition(":")
+        try:
+            rate, burst = float(rate), int(burst or max(1, round(float(rate))))
+        except ValueError:
+            continue
+        if host and rate > 0 and burst >= 1:
+            limits[host] = (rate, burst)
+    return limits
+
+_rate_overrides = parse_rate_limits(os.environ.get("WIELERMANAGER_HTTP_RATE_LIMITS"))
+HTTP_DEFAULT_RATE_LIMIT = _rate_overrides.pop("*", HTTP_DEFAULT_RATE_LIMIT)
+HTTP_RATE_LIMITS.update(_rate_overrides)
+HTTP_POOL_SIZE = 16                 # keep-alive verbindingen per host (requests)
+HTTP_RETRIES = 2                    # extra pogingen na de eerste
+HTTP_BACKOFF_BASE = 0.5             # seconden; full jitter: uniform(0, base * 2^poging)
+HTTP_BACKOFF_MAX = 8.0
+HTTP_RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+HTTP_BREAKER_THRESHOLD = 5          # opeenvolgende mislukte requests voor de breaker opent
+HTTP_BREAKER_COOLDOWN = 60          # seconden open; daarna één proefrequest
+
+@st.cache_resource
+def _http_hosts() -> tuple:
+    """Eén toestand per host per proces (ook over Streamlit-reruns heen)."""
+    return threading.Lock(), {}
+
+_http_lock, _http_host_states = _http_hosts()
+
+def _host_state(url: str) -> dict:
+    host = urlparse(url).netloc
+    with _http_lock:
+        state = _http_host_states.get(host)
+        if state is None:
+            rate, burst = HTTP_RATE_LIMITS.get(host, HTTP_DEFAULT_RATE_LIMIT)
+            state = _http_host_states[host] = {
+                "host": host, "lock": threading.Lock(), "session": None,
+                "rate": rate, "burst": burst, "tokens": float(burst), "updated": time.monotonic(),
+                "failures": 0, "open_until": None, "probing": False,
+            }
+        return state
+
+def _host_session(state: dict) -> req.Session:
+    with state["lock"]:
+        if state["session"] is None:
+            session = req.Session()
+            adapter = req.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            state["session"] = session
+        return state["session"]
+
+def _reserve_token(state: dict) -> float:
+    """Neemt één token; geeft terug hoelang er gewacht moet worden (0 als er meteen één vrij was)."""
+    with state["lock"]:
+        now = time.monotonic()
+        state["tokens"] = min(state["burst"], state["tokens"] + (now - state["updated"]) * state["rate"])
+        state["updated"] = now
+        state["tokens"] -= 1
+        return 0.0 if state["tokens"] >= 0 else -state["tokens"] / state["rate"]
+
+def _circuit_allows(state: dict) -> bool:
+    with state["lock"]:
+        if state["open_until"] is None:
+            return True
+        if time.monotonic() < state["open_until"] or state["probing"]:
+            return False
+        # Half-open: één proefrequest tegelijk
+        state["probing"] = True
+        return True
+
+def _circuit_record(state: dict, ok: bool):
+    with state["lock"]:
+        state["probing"] = False
+        if ok:
+            state["failures"] = 0
+            state["open_until"] = None
+            return
+        state["failures"] += 1
+        now = time.monotonic()
+        # Enkel bij de overgang naar open (ook na een mislukte proef), niet bij elke latere fout
+        opened = state["failures"] >= HTTP_BREAKER_THRESHOLD and (
+            state["open_until"] is None or now >= state["open_until"]
+        )
+        if opened:
+            state["open_until"] = now + HTTP_BREAKER_COOLDOWN
+    if opened:
+        count_event("http_circuit", host=state["host"], toestand="open")
+
+def circuit_is_open(url: str) -> bool:
+    state = _host_state(url)
+    with state["lock"]:
+        return state["open_until"] is not None and time.monotonic() < state["open_until"]
+
+def _backoff(attempt: int, retry_after=None) -> float:
+    delay = random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * 2 ** attempt))
+    try:
+        delay = max(delay, float(retry_after))
+    except (TypeError, ValueError):
+        pass
+    return min(delay, HTTP_BACKOFF_MAX)
+
+def http_get(url: str, headers: dict = None, timeout: float = None, stream: bool = False, method: str = "GET"):
+    """
+    GET (of met method bv. HEAD) via de gedeelde sessie van de host, met rate limiting, tot HTTP_RETRIES
+    herhalingen (bij netwerkfouten, 429 en 5xx) en een circuit breaker.
+    Geeft de Response terug, of None als de host onbereikbaar is of de breaker open staat.
+    """
+    state = _host_state(url)
+    r = None
+    for attempt in range(HTTP_RETRIES + 1):
+        delay = _reserve_token(state)
+        if delay:
+            time.sleep(delay)
+        # Na het wachten: de breaker kan intussen opengegaan zijn
+        if not _circuit_allows(state):
+            count_event("http_circuit", host=state["host"], toestand="geweigerd")
+            return None
+        t0 = time.perf_counter()
+        try:
+            r = _host_session(state).request(method, url, headers=headers, timeout=timeout, stream=stream)
+        except req.RequestException as e:
+            record_fetch(url, type(e).__name__, time.perf_counter() - t0)
+            _circuit_record(state, False)
+            r = None
+        else:
+            record_fetch(url, r.status_code, time.perf_counter() - t0, 0 if stream else len(r.content))
+            retry = r.status_code in HTTP_RETRY_STATUS
+            _circuit_record(state, not retry)
+            if not retry:
+                return r
+        if attempt < HTTP_RETRIES:
+            retry_after = r.headers.get("Retry-After") if r is not None else None
+            if r is not None:
+                r.close()
+            count_event("http_retry", host=state["host"])
+            time.sleep(_backoff(attempt, retry_after))
+    return r
+
+async def http_get_async(session, url: str) -> tuple:
+    """
+    Zelfde beleid als http_get, voor een aiohttp-sessie (die per scrape de
+    verbindingen per host hergebruikt). Geeft (status, tekst of None) terug,
+    of None als de host onbereikbaar is of de breaker open staat.
+    """
+    state = _host_state(url)
+    result = None
+    for attempt in range(HTTP_RETRIES + 1):
+        delay = _reserve_token(state)
+        if delay:
+            await asyncio.sleep(delay)
+        if not _circuit_allows(state):
+            count_event("http_circuit", host=state["host"], toestand="geweigerd")
+            return None
+        t0 = time.perf_counter()
+        retry_after = None
+        try:
+            async with session.get(url) as r:
+                text = None
+                size = 0
+                if r.status == 200:
+                    body = await r.read()
+                    text = body.decode(r.get_encoding())
+                    size = len(body)
+                retry_after = r.headers.get("Retry-After")
+                result = (r.status, text)
+        except Exception as e:
+            record_fetch(url, type(e).__name__, time.perf_counter() - t0)
+            _circuit_record(state, False)
+            result = None
+        else:
+            record_fetch(url, result[0], time.perf_counter() - t0, size)
+            retry = result[0] in HTTP_RETRY_STATUS
+            _circuit_record(state, not retry)
+            if not retry:
+                return result
+        if attempt < HTTP_RETRIES:
+            count_event("http_retry", host=state["host"])
+            await asyncio.sleep(_backoff(attempt, retry_after))
+    return result
 
 # ── Logo ──────────────────────────────────────────────────────────────────────
 def _img_to_base64(path: str) -> str:
@@ -17,51 +439,259 @@ def _img_to_base64(path: str) -> str:
         return base64.b64encode(f.read()).decode("utf-8")
 
 LOGO_PATH = "data/logo.png"
-logo_b64 = _img_to_base64(LOGO_PATH) if os.path.exists(LOGO_PATH) else ""
+
+@st.cache_resource
+def logo_base64() -> str:
+    """Het logo als base64, één keer per proces i.p.v. bij elke rerun."""
+    return _img_to_base64(LOGO_PATH) if os.path.exists(LOGO_PATH) else ""
 
 # ── Prijzen laden uit Datawrapper CSV ────────────────────────────────────────
-@st.cache_data(ttl=300)
-def load_prijzen_csv():
-    base = "https://datawrapper.dwcdn.net/dgT0d"
-    for version in range(40, 0, -1):
-        url = f"{base}/{version}/dataset.csv"
-        try:
-            r = req.get(url, timeout=5)
-            if r.status_code == 200:
-                df = pd.read_csv(io.StringIO(r.text))
-                if not df.empty:
-                    return df
-        except Exception:
+PRIJZEN_BASE_URL = "https://datawrapper.dwcdn.net/dgT0d"
+PRIJZEN_MAX_VERSION = 40
+PRIJZEN_TIMEOUT = 5
+CACHE_DIR = os.environ.get("WIELERMANAGER_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+PRIJZEN_CACHE_CSV = os.path.join(CACHE_DIR, "prijzen.csv")
+PRIJZEN_CACHE_META = os.path.join(CACHE_DIR, "prijzen.json")
+
+def _write_atomic(path: str, data: str):
+    """Schrijft via een tijdelijk bestand, zodat andere processen nooit een half bestand lezen."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+def _prijzen_url(version: int) -> str:
+    return f"{PRIJZEN_BASE_URL}/{version}/dataset.csv"
+
+def _prijzen_version_exists(version: int) -> bool:
+    # HEAD: geen body, dus de keep-alive verbinding blijft bruikbaar voor de volgende probe
+    r = http_get(_prijzen_url(version), timeout=PRIJZEN_TIMEOUT, method="HEAD")
+    return r is not None and r.status_code == 200
+
+def _existing_prijzen_versions(versions) -> list:
+    """Probeert alle gegeven versies parallel; geeft de bestaande terug, hoogste eerst."""
+    versions = sorted(versions, reverse=True)
+    if not versions:
+        return []
+    with ThreadPoolExecutor(max_workers=min(8, len(versions))) as pool:
+        exists = list(pool.map(_prijzen_version_exists, versions))
+    return [v for v, ok in zip(versions, exists) if ok]
+
+def _get_prijzen(version: int, meta: dict = None):
+    """GET van één versie; met meta (ETag/Last-Modified) als conditionele GET. None bij netwerkfout."""
+    headers = {}
+    if meta:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    return http_get(_prijzen_url(version), headers=headers, timeout=PRIJZEN_TIMEOUT)
+
+def _read_stale_prijzen():
+    """Laatste goede kopie op schijf: (DataFrame, meta) of (None, {})."""
+    try:
+        with open(PRIJZEN_CACHE_META, encoding="utf-8") as f:
+            meta = json.load(f)
+        df = pd.read_csv(PRIJZEN_CACHE_CSV)
+    except Exception:
+        return None, {}
+    if df.empty:
+        return None, {}
+    return df, meta
+
+def _store_prijzen(version: int, r):
+    _write_atomic(PRIJZEN_CACHE_CSV, r.text)
+    _write_atomic(PRIJZEN_CACHE_META, json.dumps({
+        "version": version,
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+        "fetched_at": datetime.now(pytz.utc).isoformat(),
+    }))
+
+def _parse_prijzen(r):
+    try:
+        with timed_stage("prijzen.parse"):
+            return pd.read_csv(io.StringIO(r.text))
+    except Exception:
+        return pd.DataFrame()
+
+def _search_prijzen(candidates):
+    """Nieuwste bestaande versie uit candidates downloaden en bewaren; None als er geen is."""
+    with timed_stage("prijzen.versies_zoeken"):
+        versions = _existing_prijzen_versions(candidates)
+    for version in versions:
+        with timed_stage("prijzen.download"):
+            r = _get_prijzen(version)
+        if r is None or r.status_code != 200:
             continue
-    return pd.DataFrame()
+        df = _parse_prijzen(r)
+        if not df.empty:
+            _store_prijzen(version, r)
+            return df
+    return None
+
+@timed_stage("prijzen.revalideren")
+def revalidate_prijzen(meta: dict) -> bool:
+    """
+    Vergelijkt de kopie op schijf (versie en ETag/Last-Modified in meta) met
+    Datawrapper: één conditionele GET (304) op de bekende versie plus een probe
+    van de volgende versie, beide tegelijk. True als er een nieuwe kopie op schijf staat.
+    """
+    known = meta["version"]
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        newer = pool.submit(_prijzen_version_exists, known + 1) if known < PRIJZEN_MAX_VERSION else None
+        revalidate = pool.submit(_get_prijzen, known, meta)
+        newer_exists = newer.result() if newer else False
+        r = revalidate.result()
+    if newer_exists:
+        return _search_prijzen(range(known + 1, PRIJZEN_MAX_VERSION + 1)) is not None
+    if r is None or r.status_code == 304:
+        return False    # ongewijzigd, of Datawrapper traag/onbereikbaar
+    if r.status_code == 200:
+        if _parse_prijzen(r).empty:
+            return False
+        _store_prijzen(known, r)
+        return True
+    # Bv. 404 op de bekende versie: volledig opnieuw zoeken
+    return _search_prijzen(range(1, PRIJZEN_MAX_VERSION + 1)) is not None
+
+@st.cache_resource
+def _prijzen_revalidation_state() -> dict:
+    """Per proces hoogstens één revalidatie tegelijk."""
+    return {"lock": threading.Lock(), "thread": None}
+
+_prijzen_revalidation = _prijzen_revalidation_state()
+
+def _revalidate_in_background(meta: dict):
+    def run():
+        if revalidate_prijzen(meta):
+            count_event("prijzen_bron", bron="revalidatie")
+            # Nieuwe kopie op schijf: de volgende oproep leest ze meteen
+            load_prijzen_csv.clear()
+            get_price_index.clear()
 
-def get_rider_price(rider_name: str) -> str:
-    if df_prijzen.empty or "€" not in df_prijzen.columns:
+    with _prijzen_revalidation["lock"]:
+        thread = _prijzen_revalidation["thread"]
+        if thread is not None and thread.is_alive():
+            return
+        thread = threading.Thread(target=run, name="prijzen-revalidatie", daemon=True)
+        _prijzen_revalidation["thread"] = thread
+        thread.start()
+
+def wait_for_prijzen_revalidation(timeout: float = None):
+    """Wacht op een lopende achtergrondrevalidatie (voor scripts en benchmarks)."""
+    thread = _prijzen_revalidation["thread"]
+    if thread is not None:
+        thread.join(timeout)
+
+@cached_data(ttl=300)
+@timed_stage("load_prijzen_csv")
+def load_prijzen_csv():
+    """
+    Nieuwste Datawrapper-versie van de prijzen. Staat er een kopie op schijf,
+    dan krijg je die meteen en revalideert een achtergrondthread ze (zie
+    revalidate_prijzen); een nieuwere versie is er bij de volgende oproep.
+    Enkel zonder kopie wordt er hier gezocht en gedownload.
+    """
+    with timed_stage("prijzen.lees_kopie"):
+        stale, meta = _read_stale_prijzen()
+    if stale is not None and meta.get("version"):
+        _revalidate_in_background(meta)
+        count_event("prijzen_bron", bron="kopie")
+        return stale
+
+    df = _search_prijzen(range(1, PRIJZEN_MAX_VERSION + 1))
+    if df is not None:
+        count_event("prijzen_bron", bron="zoeken")
+        return df
+    count_event("prijzen_bron", bron="kopie" if stale is not None else "geen")
+    return stale if stale is not None else pd.DataFrame()
+
+def _price_label(value) -> str:
+    try:
+        return f" ({int(value)}M)"
+    except Exception:
         return ""
-    normalized_input = normalize_name(rider_name)
-    df = df_prijzen.copy()
-    df["Normalized"] = df["Renner"].apply(normalize_name)
+
+@timed_stage("prijzen.index_bouwen")
+def build_price_index(df: pd.DataFrame) -> dict:
+    """
+    Bouwt één keer per prijzenlijst:
+    - "exact":   genormaliseerde naam → prijslabel (eerste rij wint)
+    - "choices": genormaliseerde namen in CSV-volgorde, voor de fuzzy fallback
+    """
+    if df.empty or "€" not in df.columns or "Renner" not in df.columns:
+        return {"exact": {}, "choices": []}
+    exact = {}
+    choices = []
+    for renner, prijs in zip(df["Renner"], df["€"]):
+        norm = normalize_name(renner)
+        choices.append(norm)
+        if norm not in exact:
+            exact[norm] = _price_label(prijs)
+    return {"exact": exact, "choices": choices}
+
+@cached_data(ttl=300, show_spinner=False)  # ook opgeroepen vanuit start_background_load
+def get_price_index() -> dict:
+    return build_price_index(load_prijzen_csv())
+
+def _exact_price(normalized_input: str, exact: dict):
+    """(label, methode) via exacte of rotatie-match, of (None, None)."""
     # Exacte match
-    row = df[df["Normalized"] == normalized_input]
+    label = exact.get(normalized_input)
+    if label is not None:
+        return label, "exact"
     # Rotatie-match (voor/achternaam omgewisseld)
-    if row.empty:
-        words = normalized_input.split()
-        for i in range(1, len(words)):
-            variant = " ".join(words[i:] + words[:i])
-            row = df[df["Normalized"] == variant]
-            if not row.empty:
-                break
+    words = normalized_input.split()
+    for i in range(1, len(words)):
+        label = exact.get(" ".join(words[i:] + words[:i]))
+        if label is not None:
+            return label, "rotatie"
+    return None, None
+
+def _lookup_prices(rider_names: list, price_index: dict) -> dict:
+    """
+    Exacte en rotatie-matches per naam; alle namen die dan nog over zijn gaan
+    samen in één fuzzy_resolve-pass tegen de namen uit de prijzenlijst.
+    """
+    exact = price_index["exact"]
+    if not exact:
+        return {name: "" for name in rider_names}
+    labels = {}
+    missers = []
+    for name in rider_names:
+        normalized_input = normalize_name(name)
+        label, methode = _exact_price(normalized_input, exact)
+        if label is None:
+            missers.append((name, normalized_input))
+        else:
+            labels[name] = label
+            count_event("prijs_lookup", methode=methode)
     # Fuzzy fallback
-    if row.empty:
-        match = process.extractOne(normalized_input, df["Normalized"].tolist())
-        if match and match[1] > 80:
-            row = df[df["Normalized"] == match[0]]
-    if not row.empty:
-        try:
-            return f" ({int(row.iloc[0]['€'])}M)"
-        except Exception:
-            return ""
-    return ""
+    choices = price_index["choices"]
+    matches = fuzzy_resolve([norm for _, norm in missers], choices, score_cutoff=PRICE_FUZZY_CUTOFF)
+    for (name, _), match in zip(missers, matches):
+        labels[name] = exact[choices[match]] if match is not None else ""
+        count_event("prijs_lookup", methode="fuzzy" if labels[name] else "onbekend")
+    return labels
+
+def get_rider_price(rider_name: str, price_index: dict = None) -> str:
+    """Prijslabel zoals " (6M)" voor één renner, of "" als de prijs onbekend is."""
+    if price_index is None:
+        price_index = get_price_index()
+    with timed_stage("prijzen.lookup"):
+        return _lookup_prices([rider_name], price_index)[rider_name]
+
+def get_rider_prices(rider_names, price_index: dict = None) -> dict:
+    """Prijslabels voor een hele lijst renners in één oproep (elke naam maar één keer opgezocht)."""
+    if price_index is None:
+        price_index = get_price_index()
+    with timed_stage("prijzen.lookup_batch"):
+        return _lookup_prices(list(dict.fromkeys(rider_names)), price_index)
 
 # ── PCS URL mapping per koers ─────────────────────────────────────────────────
 PCS_URLS = {
@@ -157,48 +787,741 @@ def names_match(name_a: str, name_b: str) -> bool:
     variants_b = set(all_name_variants(name_b))
     return bool(variants_a & variants_b)
 
+FUZZY_MAX_CELLS = 4_000_000     # scores per cdist-blok (float64: ~32 MB)
+PRICE_FUZZY_CUTOFF = 80         # WRatio, zoals de vroegere extractOne-fallback
+PASTE_FUZZY_CUTOFF = 88         # token_sort_ratio; strenger, want geplakte tekst bevat ook ruis
+
+def fuzzy_resolve(queries: list, choices: list, scorer=fuzz.WRatio, score_cutoff: float = PRICE_FUZZY_CUTOFF) -> list:
+    """
+    Beste kandidaat per query als index in choices, of None als niets strikt
+    boven score_cutoff scoort. Alle queries gaan in één multi-threaded
+    process.cdist-pass (in blokken van hoogstens FUZZY_MAX_CELLS scores);
+    bij gelijke score wint de eerste kandidaat, net als bij extractOne.
+    """
+    if not queries or not choices:
+        return [None] * len(queries)
+    with timed_stage("namen.fuzzy"):
+        resolved = []
+        step = max(1, FUZZY_MAX_CELLS // len(choices))
+        for start in range(0, len(queries), step):
+            scores = process.cdist(queries[start:start + step], choices, scorer=scorer,
+                                   score_cutoff=score_cutoff, dtype=np.float64, workers=-1)
+            best = scores.argmax(axis=1)
+            best_scores = scores[np.arange(len(best)), best]
+            resolved += [int(i) if score > score_cutoff else None for i, score in zip(best, best_scores)]
+        return resolved
+
+def rider_key(name: str) -> str:
+    """
+    Canonieke rider-ID: de kleinste rotatie van de genormaliseerde naam.
+    names_match(a, b) is waar als en slechts als rider_key(a) == rider_key(b).
+    """
+    return min(all_name_variants(name))
+
+@timed_stage("namen.rider_index")
+def build_rider_index(startlists: dict) -> dict:
+    """
+    Bouwt één keer per set startlijsten een index:
+    - "ids":      weergavenaam → rider-ID
+    - "variants": elke genormaliseerde rotatie → rider-ID
+    - "races":    koers → frozenset van rider-IDs aan de start
+    Teamdeelname per koers wordt zo een set-doorsnede i.p.v. names_match per paar.
+    """
+    ids, variants, races_index = {}, {}, {}
+    for race_name, startlist in startlists.items():
+        race_ids = set()
+        for name in startlist:
+            rid = ids.get(name)
+            if rid is None:
+                name_variants = all_name_variants(name)
+                rid = min(name_variants)
+                ids[name] = rid
+                for variant in name_variants:
+                    variants[variant] = rid
+            race_ids.add(rid)
+        races_index[race_name] = frozenset(race_ids)
+    return {"ids": ids, "variants": variants, "races": races_index}
+
+def lookup_rider_id(name: str, index: dict) -> str:
+    """Rider-ID van een naam: eerst exact, dan via de rotatie-map, anders berekend."""
+    rid = index["ids"].get(name)
+    if rid is None:
+        rid = index["variants"].get(normalize_name(name))
+    if rid is None:
+        rid = rider_key(name)
+    return rid
+
 # ── PCS scraping ──────────────────────────────────────────────────────────────
-@st.cache_data(ttl=1800)
-def get_startlist_from_pcs(race_name: str) -> list:
-    """Scrapt startlijst van PCS. Probeert startlist én results pagina."""
+PCS_TIMEOUT = 10            # seconden per request (connect + lezen)
+PCS_MAX_CONCURRENCY = 16    # totaal aantal gelijktijdige requests
+PCS_PER_HOST_LIMIT = 8      # beleefdheidslimiet per host
+
+def pcs_candidate_urls(race_name: str) -> list:
+    """Startlist-pagina, hoofdpagina en results-pagina (voor al gereden koersen), in voorkeursvolgorde."""
     base_url = PCS_URLS.get(race_name)
     if not base_url:
         return []
-
-    # Probeer startlist-pagina én results-pagina (voor al gereden koersen)
-    urls_to_try = [
+    return [
         base_url,
         base_url.replace("/startlist", ""),
         base_url.replace("/startlist", "/result"),
     ]
 
-    for url in urls_to_try:
+# Tags zonder eindtag; zelfde lijst als BeautifulSoup, zodat de nesting identiek blijft
+_VOID_TAGS = frozenset({
+    "area", "base", "basefont", "bgsound", "br", "col", "command", "embed", "frame", "hr", "image",
+    "img", "input", "isindex", "keygen", "link", "menuitem", "meta", "nextid", "param", "source",
+    "spacer", "track", "wbr",
+})
+
+class _StopParsing(Exception):
+    pass
+
+class _RiderLinkParser(HTMLParser):
+    """
+    Eén streaming pass over een PCS-pagina zonder boom op te bouwen: verzamelt
+    de tekst van alle links met "rider/" in de href, met per link of hij in
+    ul.startlist_v4 li staat (selector 1) en of de href "/rider/" bevat
+    (selector 2). Eindtags volgen de regels van BeautifulSoup met html.parser:
+    een eindtag sluit de laatst geopende tag met die naam, anders wordt hij
+    genegeerd. Zodra alle startlist-containers gesloten zijn en er renners in
+    stonden, stopt het parsen: de rest van de pagina verandert niets meer.
+    """
+
+    def __init__(self, containers: int):
+        super().__init__(convert_charrefs=True)
+        self.stack = []             # [(tag, link-dict, is_startlist_ul)]
+        self.open_links = []        # links waarvan de tekst nog loopt
+        self.links = []             # in documentvolgorde
+        self.containers_left = containers
+        self.startlist_hits = 0
+
+    def _in_startlist_li(self) -> bool:
+        in_ul = False
+        for tag, _, is_ul in self.stack:
+            if is_ul:
+                in_ul = True
+            elif in_ul and tag == "li":
+                return True
+        return False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _VOID_TAGS:
+            return
+        link = None
+        is_ul = False
+        if tag == "a":
+            href = dict(attrs).get("href") or ""
+            if "rider/" in href:
+                link = {"parts": [], "startlist": self._in_startlist_li(), "slash": "/rider/" in href}
+                self.links.append(link)
+                self.open_links.append(link)
+                self.startlist_hits += link["startlist"]
+        elif tag == "ul":
+            is_ul = "startlist_v4" in (dict(attrs).get("class") or "").split()
+        self.stack.append((tag, link, is_ul))
+
+    def handle_endtag(self, tag):
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i][0] == tag:
+                break
+        else:
+            return
+        for _, link, is_ul in self.stack[i:]:
+            if link is not None:
+                self.open_links.remove(link)
+            if is_ul:
+                self.containers_left -= 1
+        del self.stack[i:]
+        if self.containers_left <= 0 and self.startlist_hits:
+            raise _StopParsing
+
+    def handle_data(self, data):
+        for link in self.open_links:
+            link["parts"].append(data)
+
+def _parse_startlist(html: str) -> tuple:
+    """(rennersnamen in PCS-volgorde, naam van de selector die ze opleverde of None)."""
+    if "rider/" not in html:
+        return [], None
+    # Elk voorkomen van "startlist_v4" is hooguit één container; staat het ook
+    # elders (bv. in inline CSS), dan wordt gewoon de hele pagina geparset
+    parser = _RiderLinkParser(html.count("startlist_v4"))
+    try:
+        parser.feed(html)
+        parser.close()
+    except _StopParsing:
+        pass
+    texts = [("".join(link["parts"]).strip(), link) for link in parser.links]
+    # Probeer meerdere selectors: ul.startlist_v4 li a[href*='rider/'], dan a[href*='/rider/']
+    selector = "startlist_v4"
+    raw_names = [text for text, link in texts if link["startlist"]]
+    if not raw_names:
+        selector = "rider_links"
+        raw_names = [text for text, link in texts if link["slash"] and text and text[0].isupper()]
+    riders = [pcs_format(n) for n in raw_names if n.strip()]
+    return riders, selector if riders else None
+
+def parse_startlist_html(html: str) -> list:
+    """Haalt de rennersnamen uit een PCS-pagina, in PCS-volgorde."""
+    return _parse_startlist(html)[0]
+
+async def _fetch_page(session, url: str):
+    result = await http_get_async(session, url)
+    if result is None or result[0] != 200:
+        return None
+    return result[1]
+
+def page_hash(html: str) -> str:
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+async def _scrape_race(session, race_name: str, known: dict = None) -> dict:
+    """
+    known: de opgeslagen entry van deze koers. Is de pagina op dezelfde URL
+    byte-voor-byte ongewijzigd, dan hergebruiken we de rennerslijst zonder te parsen.
+    """
+    # Eén URL tegelijk, in voorkeursvolgorde: een fallback kost pas een request als de
+    # vorige URL faalt of geen renners oplevert. Zo vraagt een koude start ~19 pagina's
+    # i.p.v. 57 aan PCS en past ze grotendeels in de burst van de rate limiter.
+    for fallback, url in enumerate(pcs_candidate_urls(race_name)):
+        html = await _fetch_page(session, url)
+        if html is None:
+            continue
+        digest = page_hash(html)
+        if known and known.get("riders") and known.get("url") == url and known.get("page_hash") == digest:
+            count_event("pcs_pagina", status="ongewijzigd")
+            record_scrape(race_name, url, fallback, "ongewijzigd", len(known["riders"]))
+            return {"url": url, "riders": known["riders"], "page_hash": digest}
         try:
-            r = req.get(url, headers=PCS_HEADERS, timeout=10)
-            if r.status_code != 200:
-                continue
-            soup = BeautifulSoup(r.text, "html.parser")
-            # Probeer meerdere selectors
-            raw_names = [a.text.strip() for a in soup.select("ul.startlist_v4 li a[href*='rider/']")]
-            if not raw_names:
-                raw_names = [a.text.strip() for a in soup.select("a[href*='/rider/']") if a.text.strip() and a.text.strip()[0].isupper()]
-            if raw_names:
-                return [pcs_format(n) for n in raw_names if n.strip()]
+            with timed_stage("pcs.parse"):
+                riders, selector = _parse_startlist(html)
         except Exception:
             continue
-    return []
+        if riders:
+            count_event("pcs_pagina", status="geparset")
+            record_scrape(race_name, url, fallback, selector, len(riders))
+            return {"url": url, "riders": riders, "page_hash": digest}
+    record_scrape(race_name, None, None, None, 0)
+    return {"url": None, "riders": []}
+
+async def _scrape_startlists(race_names: list, on_result=None, known: dict = None) -> dict:
+    # Geen totale timeout: wachten op een vrije verbinding telt niet mee
+    timeout = aiohttp.ClientTimeout(sock_connect=PCS_TIMEOUT, sock_read=PCS_TIMEOUT)
+    connector = aiohttp.TCPConnector(limit=PCS_MAX_CONCURRENCY, limit_per_host=PCS_PER_HOST_LIMIT)
+
+    # on_result schrijft typisch naar SQLite: buiten de event loop, zodat de andere
+    # downloads intussen doorlopen, en één schrijver tegelijk in volgorde van aankomst
+    writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wm-on-result")
+
+    async def scrape(session, race_name):
+        entry = await _scrape_race(session, race_name, (known or {}).get(race_name))
+        if on_result is not None:
+            await asyncio.get_running_loop().run_in_executor(writer, on_result, race_name, entry)
+        return entry
+
+    try:
+        async with aiohttp.ClientSession(headers=PCS_HEADERS, timeout=timeout, connector=connector) as session:
+            scrapes = await asyncio.gather(*(scrape(session, race_name) for race_name in race_names))
+    finally:
+        writer.shutdown(wait=True)
+    return dict(zip(race_names, scrapes))
+
+def _run_async(coro):
+    """Draait een coroutine, ook als de huidige thread al een event loop heeft."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+def scrape_startlists(race_names, on_result=None, known: dict = None) -> dict:
+    """
+    Scrapt de startlijsten van meerdere koersen (en hun fallback-URLs) gelijktijdig.
+    Geeft per koers {"url": gebruikte URL of None, "riders": [...], "page_hash"} terug;
+    met on_result(koers, entry) hoor je het zodra elke koers afzonderlijk klaar is.
+    Met known (koers → opgeslagen entry) worden ongewijzigde pagina's niet opnieuw geparset.
+    """
+    with timed_stage("pcs.scrape"):
+        return _run_async(_scrape_startlists(list(race_names), on_result, known))
+
+# ── Startlijst-opslag (SQLite) ────────────────────────────────────────────────
+# Gedeeld door alle processen op dezelfde machine en bewaard over herstarts:
+# een nieuw proces start warm van schijf en maar één proces scrapet tegelijk.
+STARTLIST_DB = os.path.join(CACHE_DIR, "startlists.sqlite")
+SCRAPE_LEASE_SECONDS = 120      # zo lang mag één proces de scrape claimen
+CHANGES_DEFAULT_DAYS = 7        # "sinds je laatste controle" zonder eerdere controle: zoveel dagen terug
+
+@st.cache_resource
+def _store_schema_state() -> tuple:
+    """Per proces: de databasebestanden waarvan het schema al in orde gebracht is."""
+    return threading.Lock(), set()
+
+_store_schema_lock, _store_schema_ready = _store_schema_state()
+
+def _store_setup(conn):
+    """Tabellen, indexen en migraties; één keer per proces per databasebestand."""
+    conn.execute("PRAGMA journal_mode=WAL")     # blijft bewaard in het bestand zelf
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS startlists ("
+        "race TEXT PRIMARY KEY, url TEXT, riders TEXT NOT NULL, "
+        "content_hash TEXT NOT NULL, fetched_at REAL NOT NULL, page_hash TEXT)"
+    )
+    if "page_hash" not in {row[1] for row in conn.execute("PRAGMA table_info(startlists)")}:
+        conn.execute("ALTER TABLE startlists ADD COLUMN page_hash TEXT")     # opslag van vóór de page-hash
+    # Eén rij per toegevoegde (+) of afgemelde (-) renner per koers, op rider-ID (rider_key);
+    # "rider" is enkel de weergavenaam
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS startlist_changes ("
+        "race TEXT NOT NULL, rider TEXT NOT NULL, change TEXT NOT NULL, changed_at REAL NOT NULL, rider_id TEXT)"
+    )
+    if "rider_id" not in {row[1] for row in conn.execute("PRAGMA table_info(startlist_changes)")}:
+        # Opslag van vóór de rider-ID's: ID's afleiden uit de bewaarde namen. Opnieuw
+        # controleren met het schrijfslot: een ander proces kan net gemigreerd hebben.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if "rider_id" not in {row[1] for row in conn.execute("PRAGMA table_info(startlist_changes)")}:
+                conn.execute("ALTER TABLE startlist_changes ADD COLUMN rider_id TEXT")
+                namen = [row[0] for row in conn.execute("SELECT DISTINCT rider FROM startlist_changes")]
+                conn.executemany("UPDATE startlist_changes SET rider_id = ? WHERE rider = ?", [(rider_key(n), n) for n in namen])
+                conn.execute("DROP INDEX IF EXISTS startlist_changes_rider")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    conn.execute("CREATE INDEX IF NOT EXISTS startlist_changes_rider_id ON startlist_changes (rider_id, changed_at)")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS leases ("
+        "name TEXT PRIMARY KEY, owner TEXT, expires_at REAL NOT NULL)"
+    )
+
+def _store_connect():
+    # Snelle weg: schema al in orde en het bestand bestaat nog (niet weggegooid met de cache)
+    if STARTLIST_DB in _store_schema_ready and os.path.exists(STARTLIST_DB):
+        return sqlite3.connect(STARTLIST_DB, timeout=30, isolation_level=None)
+    with _store_schema_lock:
+        os.makedirs(os.path.dirname(STARTLIST_DB), exist_ok=True)
+        conn = sqlite3.connect(STARTLIST_DB, timeout=30, isolation_level=None)
+        try:
+            _store_setup(conn)
+        except BaseException:
+            conn.close()
+            raise
+        _store_schema_ready.add(STARTLIST_DB)
+        return conn
+
+def _riders_hash(riders: list) -> str:
+    return hashlib.sha256(json.dumps(riders, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def read_startlist_store() -> dict:
+    """Alle opgeslagen startlijsten: koers → {"url", "riders", "content_hash", "page_hash", "fetched_at"}."""
+    try:
+        with closing(_store_connect()) as conn:
+            rows = conn.execute("SELECT race, url, riders, content_hash, page_hash, fetched_at FROM startlists").fetchall()
+    except (sqlite3.Error, OSError):
+        return {}
+    return {
+        race: {"url": url, "riders": json.loads(riders), "content_hash": content_hash, "page_hash": page_hash,
+               "fetched_at": fetched_at}
+        for race, url, riders, content_hash, page_hash, fetched_at in rows
+    }
+
+def read_startlist_hashes():
+    """koers → content_hash, zonder de rennerslijsten te lezen; None als de opslag onbruikbaar is."""
+    try:
+        with closing(_store_connect()) as conn:
+            return dict(conn.execute("SELECT race, content_hash FROM startlists").fetchall())
+    except (sqlite3.Error, OSError):
+        return None
+
+def write_startlist_store(startlists: dict, fetched_at: float = None):
+    """
+    Schrijft {koers: {"url", "riders", "page_hash"}} weg met tijdstip en content-hash.
+    Verschilt de rennerslijst van de opgeslagen versie, dan komen de toegevoegde
+    en afgemelde renners (op rider-ID) in startlist_changes; niet als er nog geen
+    of enkel een lege vorige versie was.
+    """
+    fetched_at = time.time() if fetched_at is None else fetched_at
+    try:
+        with closing(_store_connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for race, entry in startlists.items():
+                content_hash = _riders_hash(entry["riders"])
+                vorige = conn.execute("SELECT riders, content_hash FROM startlists WHERE race = ?", (race,)).fetchone()
+                oud_riders = json.loads(vorige[0]) if vorige is not None and vorige[1] != content_hash else []
+                if oud_riders:
+                    # Op rider-ID: een andere schrijfwijze van dezelfde renner is geen wijziging
+                    oud = {rider_key(r): r for r in oud_riders}
+                    nieuw = {rider_key(r): r for r in entry["riders"]}
+                    conn.executemany(
+                        "INSERT INTO startlist_changes (race, rider_id, rider, change, changed_at) VALUES (?, ?, ?, ?, ?)",
+                        [(race, rid, nieuw[rid], "+", fetched_at) for rid in sorted(nieuw.keys() - oud.keys())]
+                        + [(race, rid, oud[rid], "-", fetched_at) for rid in sorted(oud.keys() - nieuw.keys())],
+                    )
+                conn.execute(
+                    "INSERT OR REPLACE INTO startlists (race, url, riders, content_hash, fetched_at, page_hash) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (race, entry.get("url"), json.dumps(entry["riders"], ensure_ascii=False), content_hash,
+                     fetched_at, entry.get("page_hash")),
+                )
+            conn.execute("COMMIT")
+    except (sqlite3.Error, OSError):
+        pass
+
+def read_startlist_changes(riders=None, since: float = 0.0) -> list:
+    """
+    Wijzigingen in de startlijsten na `since`, nieuwste eerst:
+    [{"race", "rider", "change" ("+" of "-"), "changed_at"}]. Met riders (namen in
+    eender welke schrijfwijze) enkel die renners, gezocht op rider-ID.
+    """
+    query = "SELECT race, rider, change, changed_at FROM startlist_changes WHERE changed_at > ?"
+    params = [since]
+    if riders is not None:
+        rider_ids = sorted({rider_key(r) for r in riders})
+        if not rider_ids:
+            return []
+        query += f" AND rider_id IN ({', '.join('?' * len(rider_ids))})"
+        params += rider_ids
+    try:
+        with closing(_store_connect()) as conn:
+            rows = conn.execute(query + " ORDER BY changed_at DESC, race, rider", params).fetchall()
+    except (sqlite3.Error, OSError):
+        return []
+    return [{"race": race, "rider": rider, "change": change, "changed_at": changed_at}
+            for race, rider, change, changed_at in rows]
+
+def seed_startlist_store(startlists: dict, fetched_at: float = None):
+    """Vult de opslag met vaste startlijsten {koers: [renners]}, bv. fixtures om offline te testen."""
+    write_startlist_store({race: {"url": None, "riders": list(riders)} for race, riders in startlists.items()}, fetched_at)
+
+def _lease_token() -> str:
+    """Uniek per claim: PID's zijn niet uniek over containers die de opslag delen (vaak overal 1)."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}"
 
-@st.cache_data(ttl=1800)
-def get_all_pcs_riders() -> list:
+def _acquire_lease(name: str):
+    """Token van de nieuwe claim, of None als een ander proces de lease nog heeft."""
+    token = _lease_token()
+    try:
+        with closing(_store_connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT expires_at FROM leases WHERE name = ?", (name,)).fetchone()
+            if row and row[0] > time.time():
+                conn.execute("ROLLBACK")
+                return None
+            conn.execute(
+                "INSERT OR REPLACE INTO leases VALUES (?, ?, ?)",
+                (name, token, time.time() + SCRAPE_LEASE_SECONDS),
+            )
+            conn.execute("COMMIT")
+            return token
+    except (sqlite3.Error, OSError):
+        # Geen bruikbare opslag: dan scrapet dit proces gewoon zelf
+        return token
+
+def _renew_lease(name: str, token: str):
+    """Verlengt onze lease, zodat een trage scrape (rate limiter, retries) niet verloopt."""
+    try:
+        with closing(_store_connect()) as conn:
+            conn.execute(
+                "UPDATE leases SET expires_at = ? WHERE name = ? AND owner = ?",
+                (time.time() + SCRAPE_LEASE_SECONDS, name, token),
+            )
+    except (sqlite3.Error, OSError):
+        pass
+
+def _release_lease(name: str, token: str):
+    # Enkel onze eigen claim: is die intussen verlopen en door een ander proces
+    # overgenomen, dan blijft diens lease staan
+    try:
+        with closing(_store_connect()) as conn:
+            conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, token))
+    except (sqlite3.Error, OSError):
+        pass
+
+def _wait_for_lease(name: str):
+    """Wacht tot een ander proces klaar is met scrapen (of zijn lease verloopt)."""
+    deadline = time.time() + SCRAPE_LEASE_SECONDS
+    while time.time() < deadline:
+        try:
+            with closing(_store_connect()) as conn:
+                row = conn.execute("SELECT expires_at FROM leases WHERE name = ?", (name,)).fetchone()
+        except (sqlite3.Error, OSError):
+            return
+        if not row or row[0] <= time.time():
+            return
+        time.sleep(0.5)
+
+@st.cache_resource
+def _scraped_startlists_store() -> tuple:
+    """Per proces: de laatste scrape per koers, voor als de opslag onbruikbaar is."""
+    return threading.Lock(), {}
+
+_scraped_lock, _scraped_startlists = _scraped_startlists_store()
+
+def _remember_scrapes(scraped: dict):
+    with _scraped_lock:
+        for race, entry in scraped.items():
+            if entry["riders"] or race not in _scraped_startlists:
+                _scraped_startlists[race] = {**entry, "content_hash": _riders_hash(entry["riders"])}
+
+@timed_stage("startlijsten.verversen")
+def refresh_startlist_store(race_names) -> dict:
+    """
+    Scrapt de gegeven koersen waarvan de opgeslagen startlijst ontbreekt of te oud is,
+    schrijft het resultaat weg en geeft de volledige opslag terug. Scrapet een ander
+    proces al, dan wachten we op zijn resultaat i.p.v. PCS zelf opnieuw te bevragen.
+    """
+    stored = read_startlist_store()
+    te_scrapen = [race for race in race_names if is_startlist_stale(race, stored.get(race))]
+    # Staat de circuit breaker voor PCS open, dan meteen de opgeslagen startlijsten
+    te_scrapen = [race for race in te_scrapen if race not in PCS_URLS or not circuit_is_open(PCS_URLS[race])]
+    if not te_scrapen:
+        return stored
+    lease = _acquire_lease("scrape")
+    if lease is None:
+        _wait_for_lease("scrape")
+        return read_startlist_store()
+    try:
+        # Opnieuw lezen: misschien heeft een ander proces net gescrapet
+        stored = read_startlist_store()
+        te_scrapen = [race for race in te_scrapen if is_startlist_stale(race, stored.get(race))]
+
+        def bewaar(race, entry):
+            # Per koers meteen wegschrijven, zodat een opstartende UI ze één voor één ziet
+            # verschijnen. Een lege scrape (PCS-hapering) overschrijft geen eerder goede startlijst.
+            if entry["riders"] or not stored.get(race, {}).get("riders"):
+                write_startlist_store({race: entry})
+            _renew_lease("scrape", lease)
+
+        scraped = scrape_startlists(te_scrapen, on_result=bewaar, known=stored) if te_scrapen else {}
+    finally:
+        _release_lease("scrape", lease)
+    _remember_scrapes(scraped)
+    stored = read_startlist_store()
+    # Zonder bruikbare opslag toch het scrape-resultaat teruggeven
+    for race, entry in scraped.items():
+        stored.setdefault(race, entry)
+    return stored
+
+# ── Verversingsplanning per koers ─────────────────────────────────────────────
+# Gereden koersen liggen vast, de eerstvolgende koersen worden vaak ververst en
+# koersen ver in de toekomst zelden. Het verversen gebeurt in een achtergrond-
+# thread, zodat een pagina nooit op een scrape wacht (ook niet bij een koude start).
+REFRESH_INTERVAL = 60                # seconden tussen twee rondes van de planner
+REFRESH_NEXT_RACES = 3               # zoveel eerstvolgende koersen: agressief verversen
+REFRESH_NEXT_MAX_AGE = 10 * 60
+REFRESH_SOON_DAYS = 7                # start binnen deze termijn: geregeld verversen
+REFRESH_SOON_MAX_AGE = 60 * 60
+REFRESH_FAR_MAX_AGE = 12 * 3600      # verder weg: zelden verversen
+RACE_FINISHED_AFTER = 6 * 3600       # na de start; een scrape daarna is definitief
+
+def race_start_timestamp(race_date: str) -> float:
+    cet = pytz.timezone("Europe/Brussels")
+    return cet.localize(datetime.strptime(race_date, "%Y-%m-%d %H:%M")).timestamp()
+
+@functools.lru_cache(maxsize=4)
+def _race_starts(race_table: tuple) -> dict:
+    return {name: race_start_timestamp(date) for name, date, _ in race_table}
+
+def race_starts() -> dict:
+    """koers → starttijdstip (Unix-tijd) volgens de races-lijst."""
+    return _race_starts(tuple(races))
+
+def startlist_max_age(race_name: str, now: float = None):
+    """
+    Hoe oud (in seconden) de opgeslagen startlijst van een koers mag zijn.
+    None betekent bevroren: de koers is gereden en na de finish al gescrapet.
+    """
+    now = time.time() if now is None else now
+    starts = race_starts()
+    start = starts.get(race_name)
+    if start is None:
+        return REFRESH_SOON_MAX_AGE
+    if now >= start + RACE_FINISHED_AFTER:
+        return None
+    komende = sorted(t for t in starts.values() if now < t + RACE_FINISHED_AFTER)
+    if komende.index(start) < REFRESH_NEXT_RACES:
+        return REFRESH_NEXT_MAX_AGE
+    if start - now < REFRESH_SOON_DAYS * 86400:
+        return REFRESH_SOON_MAX_AGE
+    return REFRESH_FAR_MAX_AGE
+
+def is_startlist_stale(race_name: str, entry: dict, now: float = None) -> bool:
+    now = time.time() if now is None else now
+    if entry is None:
+        return True
+    max_age = startlist_max_age(race_name, now)
+    if max_age is None:
+        # Gereden koers: één scrape na de finish volstaat; lukte die niet, dan af en toe opnieuw
+        finished_at = race_starts()[race_name] + RACE_FINISHED_AFTER
+        if entry["fetched_at"] < finished_at:
+            return True
+        return not entry["riders"] and now - entry["fetched_at"] > REFRESH_FAR_MAX_AGE
+    return now - entry["fetched_at"] > max_age
+
+def _refresh_loop():
+    while True:
+        try:
+            refresh_startlist_store(PCS_URLS)
+        except Exception:
+            pass
+        if METRICS_FILE:
+            _write_atomic(METRICS_FILE, metrics_prometheus())
+        time.sleep(REFRESH_INTERVAL)
+
+@st.cache_resource
+def start_refresh_scheduler() -> threading.Thread:
+    """Start één keer per proces de achtergrondplanner die de startlijst-opslag vers houdt."""
+    thread = threading.Thread(target=_refresh_loop, name="startlist-refresh", daemon=True)
+    thread.start()
+    return thread
+
+# ── Startlijstversie ──────────────────────────────────────────────────────────
+# Alles wat van de startlijsten afgeleid is, wordt gecachet per versie (een hash
+# over de content-hashes in de opslag) i.p.v. per TTL: een verversing die niets
+# veranderde, bouwt dus niets opnieuw op.
+
+class _StoreChanged(Exception):
+    """De opslag veranderde tussen het bepalen van de versie en het lezen."""
+
+def _hashes_version(hashes: dict) -> str:
+    return hashlib.sha256(json.dumps(sorted(hashes.items())).encode("utf-8")).hexdigest()[:16]
+
+def startlists_version() -> str:
+    """
+    Huidige versie van de opgeslagen startlijsten; koersen zonder opgeslagen
+    startlijst tellen gewoon niet mee (tijdens een koude start groeit de versie
+    dus koers per koers). Scrapet nooit: dat doen de planner en load_startlists.
+    Zonder bruikbare opslag: de versie van de scrapes in het geheugen van dit proces.
+    """
+    hashes = read_startlist_hashes()
+    if hashes is None:
+        with _scraped_lock:
+            hashes = {race: entry["content_hash"] for race, entry in _scraped_startlists.items()}
+        return "mem-" + _hashes_version(hashes)
+    return _hashes_version(hashes)
+
+def by_startlist_version(fn=None, cache=None):
+    """
+    Cachet fn(*args, version) per startlijstversie (standaard met cached_data);
+    de wrapper vult de huidige versie zelf in. wrapper.at(*args, version) geeft
+    afgeleide functies een consistente versie. Verandert de opslag tijdens het
+    lezen, dan opnieuw met de nieuwe versie.
+    """
+    def decorate(fn):
+        cached = (cache or cached_data(max_entries=2, show_spinner=False))(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args):
+            for _ in range(3):
+                try:
+                    return cached(*args, startlists_version())
+                except _StoreChanged:
+                    continue
+            return cached(*args, startlists_version())
+        wrapper.at = cached
+        wrapper.clear = cached.clear
+        return wrapper
+    return decorate(fn) if fn is not None else decorate
+
+@by_startlist_version  # ook opgeroepen vanuit start_background_load
+def get_all_startlists(version: str) -> dict:
+    """
+    Alle PCS startlijsten uit de gedeelde opslag (of, zonder bruikbare opslag,
+    uit het geheugen van dit proces). Het verversen zelf doet start_refresh_scheduler
+    in de achtergrond; ontbrekende koersen zijn een lege lijst.
+    """
+    if version.startswith("mem-"):
+        with _scraped_lock:
+            stored = dict(_scraped_startlists)
+        hash_version = "mem-" + _hashes_version({race: entry["content_hash"] for race, entry in stored.items()})
+    else:
+        stored = read_startlist_store()
+        hash_version = _hashes_version({race: entry["content_hash"] for race, entry in stored.items()})
+    if hash_version != version:
+        raise _StoreChanged
+    return {race_name: stored[race_name]["riders"] if race_name in stored else [] for race_name in PCS_URLS}
+
+def load_startlists() -> dict:
+    """
+    Alle startlijsten, na eerst de koersen zonder opgeslagen startlijst (koude
+    start) te scrapen. Voor de achtergrondlader en scripts zonder planner.
+    """
+    hashes = read_startlist_hashes()
+    ontbrekend = [race_name for race_name in PCS_URLS if hashes is None or race_name not in hashes]
+    if ontbrekend:
+        refresh_startlist_store(ontbrekend)
+    return get_all_startlists()
+
+def get_startlist_from_pcs(race_name: str) -> list:
+    """Startlijst van één koers, uit de gedeelde cache van get_all_startlists."""
+    return get_all_startlists().get(race_name, [])
+
+@by_startlist_version
+def get_rider_index(version: str) -> dict:
+    """Rider-index over alle startlijsten, gecachet naast get_all_startlists."""
+    return build_rider_index(get_all_startlists.at(version))
+
+@by_startlist_version
+def get_all_pcs_riders(version: str) -> list:
     """Haalt alle unieke renners op uit alle PCS startlijsten."""
     all_riders = set()
-    for race_name in PCS_URLS:
-        riders = get_startlist_from_pcs(race_name)
+    for riders in get_all_startlists.at(version).values():
         all_riders.update(riders)
     return sorted(all_riders)
 
+# ── Progressief opstarten ─────────────────────────────────────────────────────
+STARTUP_GRACE_SECONDS = 0.3     # zo lang wachten we op een warme cache voor we de laadstatus tonen
+STARTUP_POLL_SECONDS = 1        # verversingsinterval van de laadstatus
+EMPTY_PRICE_INDEX = {"exact": {}, "choices": []}
+
+@st.cache_resource
+def start_background_load() -> dict:
+    """
+    Start één keer per proces het laden van prijzen en startlijsten in de
+    achtergrond, zodat de UI meteen kan tekenen. Daarna houden de caches en
+    start_refresh_scheduler alles vers.
+    """
+    pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="wm-laden")
+    return {
+        "prijzen": pool.submit(get_price_index),
+        "startlijsten": pool.submit(load_startlists),
+    }
+
+def wait_for_background_load(load: dict, timeout: float = STARTUP_GRACE_SECONDS) -> bool:
+    """True als alles geladen is; wacht hoogstens timeout seconden (warme cache: meteen klaar)."""
+    _, pending = concurrent.futures.wait(load.values(), timeout=timeout)
+    return not pending
+
+@st.fragment(run_every=STARTUP_POLL_SECONDS)
+def render_loading_status(load: dict):
+    """
+    Laadstatus die zichzelf ververst. Tekent de hele app opnieuw zodra er een
+    startlijst bijkomt (de secties rekenen met wat er al is) en als alles er is.
+    Nooit tijdens een volledige run (vlag laadstatus_in_app): een rerun zou dan
+    een net aangeklikte knop verder in het script ongedaan maken.
+    """
+    in_app = st.session_state.pop("laadstatus_in_app", False)
+    if all(future.done() for future in load.values()) and not in_app:
+        st.rerun()
+    if not load["startlijsten"].done():
+        stored = read_startlist_store()
+        klaar = {race: len(stored[race]["riders"]) for race in PCS_URLS if stored.get(race, {}).get("riders")}
+        if st.session_state.get("geladen_koersen") != len(klaar):
+            st.session_state.geladen_koersen = len(klaar)
+            if not in_app:
+                st.rerun()
+        st.progress(len(klaar) / len(PCS_URLS), text=f"Startlijsten laden vanuit ProCyclingStats: {len(klaar)}/{len(PCS_URLS)}")
+        st.dataframe(pd.DataFrame([
+            {"Wedstrijd": race, "Renners": f"✅ {klaar[race]}" if race in klaar else "⏳"}
+            for race, _, _ in races
+        ]).set_index("Wedstrijd"))
+    if not load["prijzen"].done():
+        st.caption("💶 Prijzen worden nog geladen...")
+
 # ── Achtergrond ───────────────────────────────────────────────────────────────
 def set_background():
+    logo_b64 = logo_base64()
     st.markdown(
     f"""
     <style>
@@ -232,8 +1555,6 @@ def set_background():
     unsafe_allow_html=True
 )
 
-set_background()
-
 # ── Wedstrijden ───────────────────────────────────────────────────────────────
 races = [
     ("Omloop Het Nieuwsblad",    "2026-02-28 11:15", "World Tour"),
@@ -257,58 +1578,341 @@ races = [
     ("Liège-Bastogne-Liège",     "2026-04-26 10:00", "Monument"),
 ]
 
-# ── Prijzen laden ─────────────────────────────────────────────────────────────
-df_prijzen = load_prijzen_csv()
+# ── Lokale snapshots (Arrow) ──────────────────────────────────────────────────
+# De spreadsheets in data/ worden één keer omgezet naar een getypte Arrow-
+# snapshot in CACHE_DIR; elk proces memory-mapt die daarna i.p.v. opnieuw te
+# parsen. Ongewijzigde mtime/grootte: snapshot meteen gebruiken. Anders beslist
+# de sha256 van de bron of er opnieuw geparset moet worden.
+SNAPSHOT_DIR = os.path.join(CACHE_DIR, "snapshots")
+# Ophogen bij elke wijziging aan parse_dataset/parse_prijzen_xlsx (kolommen, dtypes):
+# snapshots met een andere versie worden opnieuw opgebouwd
+SNAPSHOT_SCHEMA_VERSION = 1
+PRIJZEN_XLSX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "PrijzenWielermanager.xlsx")
 
-# ── Renners laden bij opstarten vanuit PCS ────────────────────────────────────
-if "all_riders" not in st.session_state:
-    with st.spinner("Renners laden vanuit ProCyclingStats..."):
-        st.session_state.all_riders = get_all_pcs_riders()
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
-# ── Helpers ───────────────────────────────────────────────────────────────────
-def fetch_data(selected_riders):
-    results = []
-    rider_participation = {rider: 0 for rider in selected_riders}
-    rider_schedule = {rider: {race[0]: "❌" for race in races} for rider in selected_riders}
-    weak_races = {}
-    cet = pytz.timezone("Europe/Brussels")
-    now = datetime.now(pytz.utc).astimezone(cet).replace(tzinfo=None)
+def _read_snapshot(path: str) -> pd.DataFrame:
+    # Geen context manager: de tekstkolommen (pandas' str-dtype, vanaf pandas 3 Arrow-
+    # backed) blijven naar de gemapte buffers verwijzen en delen zo de page cache met
+    # andere processen. Numerieke en bool-kolommen kopieert to_pandas wel naar NumPy
+    # (Arrow-bools zijn bits); die zijn klein t.o.v. de namen.
+    return pa.ipc.open_file(pa.memory_map(path)).read_all().to_pandas()
+
+def _write_snapshot(path: str, df: pd.DataFrame):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+def load_snapshot(source: str, parse) -> pd.DataFrame:
+    """
+    parse(source) als getypte DataFrame, via de snapshot in SNAPSHOT_DIR.
+    Ontbreekt de bron, dan een lege DataFrame. Lukt schrijven niet (bv. een
+    read-only schijf) of ontbreekt pyarrow, dan gewoon het resultaat van parse.
+    """
+    if not os.path.exists(source):
+        return pd.DataFrame()
+    if pa is None:
+        count_event("snapshot", bron="parse")
+        return parse(source)
+    name = os.path.basename(source)
+    snapshot = os.path.join(SNAPSHOT_DIR, name + ".arrow")
+    meta_path = os.path.join(SNAPSHOT_DIR, name + ".json")
+    stat = os.stat(source)
+    signature = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        meta = {}
+
+    if os.path.exists(snapshot) and meta.get("schema") == SNAPSHOT_SCHEMA_VERSION:
+        sha = None
+        if {k: meta.get(k) for k in signature} != signature:
+            # Aangeraakt maar misschien niet gewijzigd (git checkout, kopie): inhoud beslist
+            sha = _file_sha256(source)
+            if sha == meta.get("sha256"):
+                _write_atomic(meta_path, json.dumps({**meta, **signature}))
+        if sha is None or sha == meta.get("sha256"):
+            try:
+                with timed_stage("snapshot.lezen"):
+                    df = _read_snapshot(snapshot)
+                count_event("snapshot", bron="snapshot")
+                return df
+            except (OSError, pa.ArrowException):
+                pass    # beschadigd of half geschreven: opnieuw opbouwen
+
+    with timed_stage("snapshot.parse"):
+        df = parse(source)
+    try:
+        with timed_stage("snapshot.schrijven"):
+            _write_snapshot(snapshot, df)
+        _write_atomic(meta_path, json.dumps({
+            **signature, "sha256": _file_sha256(source), "rows": len(df), "schema": SNAPSHOT_SCHEMA_VERSION,
+        }))
+    except (OSError, pa.ArrowException):
+        pass
+    count_event("snapshot", bron="parse")
+    return df
+
+def race_flags(column: pd.Series) -> pd.Series:
+    """X-kolom (of al bool uit een snapshot) → bool per renner."""
+    if column.dtype == bool:
+        return column
+    return column.astype(str).str.strip().str.upper() == "X"
+
+def parse_dataset(path: str) -> pd.DataFrame:
+    """dataset.csv met propere types: prijs en punten als float, X-kolommen als bool."""
+    df = pd.read_csv(path)
+    for col in ("€", "Tot Ptn", "#races '26"):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(np.float64)
+    if "Ptn/M" in df.columns:
+        df["Ptn/M"] = np.array([parse_decimal(v) for v in df["Ptn/M"]], dtype=np.float64)
+    for code in DATASET_RACE_CODES:
+        if code in df.columns:
+            df[code] = race_flags(df[code])
+    return df
+
+def parse_prijzen_xlsx(path: str) -> pd.DataFrame:
+    """PrijzenWielermanager.xlsx (Renner, Prijs) → Renner als tekst, prijs als float."""
+    df = pd.read_excel(path, engine="openpyxl")
+    if "Renner" not in df.columns or "Prijs" not in df.columns:
+        return pd.DataFrame(columns=["Renner", "€"])
+    return pd.DataFrame({
+        "Renner": df["Renner"],
+        "€": pd.to_numeric(df["Prijs"], errors="coerce").astype(np.float64),
+    })
 
-    for race_name, race_date, category in races:
-        race_datetime = datetime.strptime(race_date, "%Y-%m-%d %H:%M")
-        startlist = get_startlist_from_pcs(race_name)
+@cached_data
+def load_prijzen_xlsx() -> pd.DataFrame:
+    """Prijslijst uit data/PrijzenWielermanager.xlsx, in hetzelfde formaat als de Datawrapper-CSV."""
+    return load_snapshot(PRIJZEN_XLSX_PATH, parse_prijzen_xlsx)
+
+# ── Deelnamematrix ────────────────────────────────────────────────────────────
+DATASET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "dataset.csv")
+
+# X-kolommen in dataset.csv → koers in races
+DATASET_RACE_CODES = {
+    "OML": "Omloop Het Nieuwsblad",
+    "KBK": "Kuurne-Brussel-Kuurne",
+    "SAM": "GP-Samyn",
+    "STR": "Strade Bianche",
+    "NOK": "Nokere Koerse",
+    "BKC": "Bredene Koksijde Classic",
+    "MSR": "Milano-Sanremo",
+    "RVB": "Classic Brugge-De Panne",
+    "E3": "E3 Harelbeke",
+    "IFF": "Gent-Wevelgem",
+    "DDV": "Dwars door Vlaanderen",
+    "RVV": "Ronde van Vlaanderen",
+    "SP": "Scheldeprijs",
+    "PR": "Paris-Roubaix",
+    "RVL": "Ronde van Limburg",
+    "BR P": "Brabantse Pijl",
+    "AGR": "Amstel Gold Race",
+    "WA P": "La Fleche Wallone",
+    "LBL": "Liège-Bastogne-Liège",
+}
 
-        if not startlist:
-            renners_count = "⚠️ Geen data"
-            team_riders = []
+@cached_data
+def load_dataset() -> pd.DataFrame:
+    return load_snapshot(DATASET_PATH, parse_dataset)
+
+def dataset_startlists(dataset: pd.DataFrame) -> dict:
+    """Verwachte deelnames volgens de X-kolommen van dataset.csv: koers → [renners]."""
+    if dataset.empty or "Renner" not in dataset.columns:
+        return {}
+    startlists = {}
+    for code, race_name in DATASET_RACE_CODES.items():
+        if code not in dataset.columns:
+            continue
+        mask = race_flags(dataset[code])
+        startlists[race_name] = [pcs_format(r) for r in dataset.loc[mask, "Renner"] if isinstance(r, str)]
+    return startlists
+
+@timed_stage("deelnamematrix.bouwen")
+def build_participation(startlists: dict, dataset_lists: dict = None) -> dict:
+    """
+    Dichte bool-matrix van elke gekende renner × elke koers:
+    - "matrix":  DataFrame, rijen = rider-IDs (rider_key), kolommen = koersen in races-volgorde
+    - "names":   rider-ID → weergavenaam (zoals eerst gezien op PCS, anders uit dataset.csv)
+    - "sources": koers → "pcs", "dataset" of None (geen data)
+    - "version": hash van de gebruikte startlijsten, om afgeleide state te invalideren
+    Een gescrapete startlijst gaat voor; koersen zonder startlijst vallen terug op dataset.csv.
+    """
+    dataset_lists = dataset_lists or {}
+    race_names = [race[0] for race in races]
+    sources, lists = {}, {}
+    for race_name in race_names:
+        if startlists.get(race_name):
+            sources[race_name], lists[race_name] = "pcs", startlists[race_name]
+        elif dataset_lists.get(race_name):
+            sources[race_name], lists[race_name] = "dataset", dataset_lists[race_name]
         else:
-            team_riders = [s for s in selected_riders if any(names_match(s, starter) for starter in startlist)]
-            renners_count = len(team_riders)
-            for rider in team_riders:
-                if race_datetime > now:
-                    rider_participation[rider] += 1
-                rider_schedule[rider][race_name] = "✅"
-            if race_datetime > now and renners_count <= 9:
-                weak_races[race_name] = startlist
-
-        results.append({"Wedstrijd": race_name, "Datum": race_date, "Categorie": category, "Aantal renners": str(renners_count)})
-
-    recommended_transfers = {}
-    for race, race_riders in weak_races.items():
-        for rider in race_riders:
-            if not any(names_match(rider, s) for s in selected_riders):
-                recommended_transfers[rider] = recommended_transfers.get(rider, 0) + 1
+            sources[race_name] = None
+
+    names, keys = {}, {}
+    for riders in list(startlists.values()) + list(dataset_lists.values()):
+        for name in riders:
+            if name not in keys:
+                keys[name] = rider_key(name)
+                names.setdefault(keys[name], name)
+
+    rows = {rid: i for i, rid in enumerate(names)}
+    matrix = np.zeros((len(rows), len(race_names)), dtype=bool)
+    for col, race_name in enumerate(race_names):
+        for name in lists.get(race_name, []):
+            matrix[rows[keys[name]], col] = True
+    return {
+        "matrix": pd.DataFrame(matrix, index=list(rows), columns=race_names),
+        "names": names,
+        "sources": sources,
+        "version": hashlib.sha256(json.dumps([sources, lists], sort_keys=True).encode("utf-8")).hexdigest(),
+    }
+
+@by_startlist_version
+def get_participation(version: str) -> dict:
+    return build_participation(get_all_startlists.at(version), dataset_startlists(load_dataset()))
+
+def future_races(now: float = None) -> pd.Series:
+    """Bool per koers: start die nog in de toekomst ligt."""
+    now = time.time() if now is None else now
+    return pd.Series({name: start > now for name, start in race_starts().items()})
+
+def races_with_data(participation: dict) -> pd.Series:
+    return pd.Series({race_name: source is not None for race_name, source in participation["sources"].items()})
+
+def team_schedule(selected_riders, participation: dict = None, rider_index: dict = None) -> pd.DataFrame:
+    """Bool-schema van de gegeven renners: rijen in selectievolgorde met hun weergavenaam."""
+    if participation is None:
+        participation = get_participation()
+    index = get_rider_index() if rider_index is None else rider_index
+    ids = [lookup_rider_id(rider, index) for rider in selected_riders]
+    schedule = participation["matrix"].reindex(ids, fill_value=False)
+    schedule.index = list(selected_riders)
+    return schedule
+
+def render_schedule(schedule: pd.DataFrame) -> pd.DataFrame:
+    """Zet een bool-schema pas bij weergave om naar ✅/❌."""
+    return pd.DataFrame(np.where(schedule.to_numpy(), "✅", "❌"), index=schedule.index, columns=schedule.columns)
+
+# ── Incrementele teamevaluatie ────────────────────────────────────────────────
+# Per sessie bewaren we de teamtellingen per koers en de transfer-telling van
+# alle renners. Wijzigt de selectie, dan verwerken we enkel de toegevoegde en
+# verwijderde renners; een koers die (on)zwak wordt, past de telling met één
+# kolom aan. De kost van een rerun hangt zo niet af van de teamgrootte.
+ZWAK_BEZET = 9      # koersen met zoveel of minder renners van je team zijn zwak bezet
+
+def _future_mask(columns, now: float = None) -> np.ndarray:
+    now = time.time() if now is None else now
+    starts = race_starts()
+    return np.array([starts[race_name] > now for race_name in columns], dtype=bool)
+
+def new_team_evaluation(participation: dict, now: float = None) -> dict:
+    matrix = participation["matrix"]
+    return {
+        "version": participation["version"],
+        "future": _future_mask(matrix.columns, now),
+        "has_data": races_with_data(participation)[matrix.columns].to_numpy(),
+        "riders": [],
+        "rows": {},             # renner → bool-rij over de koersen
+        "positions": {},        # renner → rijnummer in de matrix (None als onbekend)
+        "counts": np.zeros(len(matrix.columns), dtype=int),
+        "weak": np.zeros(len(matrix.columns), dtype=bool),
+        "tally": np.zeros(len(matrix), dtype=int),
+    }
+
+def _refresh_weak_races(state: dict, values: np.ndarray):
+    weak = state["future"] & state["has_data"] & (state["counts"] <= ZWAK_BEZET)
+    nu_zwak = weak & ~state["weak"]
+    niet_meer_zwak = state["weak"] & ~weak
+    if nu_zwak.any():
+        state["tally"] += values[:, nu_zwak].sum(axis=1)
+    if niet_meer_zwak.any():
+        state["tally"] -= values[:, niet_meer_zwak].sum(axis=1)
+    state["weak"] = weak
 
+@timed_stage("teamevaluatie.bijwerken")
+def update_team_evaluation(state, selected_riders, participation: dict = None, now: float = None,
+                           rider_index: dict = None) -> dict:
+    """
+    Brengt een (eventueel leeg) evaluatie-state in lijn met selected_riders.
+    Enkel het verschil met de vorige selectie wordt verwerkt; bij nieuwe
+    startlijsten of een koers die intussen gestart is, beginnen we opnieuw.
+    """
+    if participation is None:
+        participation = get_participation()
+    matrix = participation["matrix"]
+    future = _future_mask(matrix.columns, now)
+    if state is None or state["version"] != participation["version"] or not np.array_equal(state["future"], future):
+        state = new_team_evaluation(participation, now)
+
+    values = matrix.to_numpy()
+    selectie = set(selected_riders)
+    for rider in [r for r in state["rows"] if r not in selectie]:
+        state["counts"] -= state["rows"].pop(rider)
+        del state["positions"][rider]
+    nieuw = [r for r in selected_riders if r not in state["rows"]]
+    if nieuw:
+        index = get_rider_index() if rider_index is None else rider_index
+        for rider in nieuw:
+            rid = lookup_rider_id(rider, index)
+            pos = matrix.index.get_loc(rid) if rid in matrix.index else None
+            # Kopie: een view zou de hele deelnamematrix van deze versie in de sessie vasthouden
+            row = values[pos].copy() if pos is not None else np.zeros(len(matrix.columns), dtype=bool)
+            state["rows"][rider] = row
+            state["positions"][rider] = pos
+            state["counts"] += row
+    _refresh_weak_races(state, values)
+    state["riders"] = list(selected_riders)
+    return state
+
+@timed_stage("teamevaluatie.resultaten")
+def evaluation_results(state: dict, participation: dict = None):
+    """Zelfde uitvoer als fetch_data, opgebouwd uit een evaluatie-state."""
+    if participation is None:
+        participation = get_participation()
+    matrix = participation["matrix"]
+    race_names = list(matrix.columns)
+    counts = dict(zip(race_names, state["counts"]))
+    has_data = dict(zip(race_names, state["has_data"]))
+    results = [
+        {
+            "Wedstrijd": race_name, "Datum": race_date, "Categorie": category,
+            "Aantal renners": str(int(counts[race_name])) if has_data[race_name] else "⚠️ Geen data",
+        }
+        for race_name, race_date, category in races
+    ]
+    riders = state["riders"]
+    rows = np.array([state["rows"][r] for r in riders], dtype=bool).reshape(len(riders), len(race_names))
+    rider_schedule = pd.DataFrame(rows, index=riders, columns=race_names)
+    open_koersen = state["future"] & state["has_data"]
+    rider_participation = dict(zip(riders, rows[:, open_koersen].sum(axis=1).astype(int).tolist()))
+
+    # Voorgestelde transfers: renners buiten het team, geteld over de zwak bezette toekomstige koersen
+    tally = state["tally"].copy()
+    team_posities = [pos for pos in state["positions"].values() if pos is not None]
+    tally[team_posities] = 0
+    namen = participation["names"]
+    recommended_transfers = {namen[matrix.index[pos]]: int(tally[pos]) for pos in np.flatnonzero(tally > 0)}
     return results, rider_participation, rider_schedule, recommended_transfers
 
-def fetch_rider_schedule(selected_riders):
-    rider_schedule = {rider: {race[0]: "❌" for race in races} for rider in selected_riders}
-    for race_name, _, _ in races:
-        startlist = get_startlist_from_pcs(race_name)
-        for rider in selected_riders:
-            if any(names_match(rider, starter) for starter in startlist):
-                rider_schedule[rider][race_name] = "✅"
-    return rider_schedule
+# ── Helpers ───────────────────────────────────────────────────────────────────
+@timed_stage("fetch_data")
+def fetch_data(selected_riders, now: float = None):
+    participation = get_participation()
+    return evaluation_results(update_team_evaluation(None, selected_riders, participation, now=now), participation)
+
+def fetch_rider_schedule(selected_riders, participation: dict = None, rider_index: dict = None):
+    return team_schedule(selected_riders, participation, rider_index)
 
 def get_next_race():
     now = datetime.now()
@@ -330,8 +1934,21 @@ def countdown_to_next_race():
             return race_name, days, hours, minutes
     return None, None, None, None
 
-def extract_riders_from_paste(text: str, all_riders: list) -> tuple:
-    """Haalt rennersnamen uit ruwe geplakte tekst van de wielermanager-site."""
+@timed_stage("namen.plakken")
+def extract_riders_from_paste(text: str, all_riders: list, paste_index: dict = None) -> tuple:
+    """
+    Haalt rennersnamen uit ruwe geplakte tekst van de wielermanager-site.
+    Geeft (herkende renners, niet herkende namen, suggesties) terug. Herkend
+    wordt enkel via de strikte match (achternaam-blok + voornaamletter, zoals
+    altijd). Regels zonder strikte match krijgen samen nog één fuzzy kans,
+    maar een fuzzy treffer is nooit meer dan een suggestie (regel, renner) om
+    te bevestigen: wat strikt niet klopt, klopt per definitie niet exact.
+    Niet herkend zijn enkel regels die op een naam lijken (zie looks_like_name).
+    Geef de paste_index van build_paste_index(all_riders) mee om die niet bij
+    elke oproep opnieuw op te bouwen.
+    """
+    if paste_index is None:
+        paste_index = build_paste_index(all_riders)
     kandidaten = re.split(r"[,\n]", text)
     kandidaten = [k.strip() for k in kandidaten if k.strip()]
 
@@ -360,172 +1977,730 @@ def extract_riders_from_paste(text: str, all_riders: list) -> tuple:
 
     kandidaten_gefilterd = [k for k in kandidaten if is_likely_rider(k)]
 
-    # Voorbereken: voor elke bekende renner de gesplitste voornaam/achternaam
-    # We beschouwen het LAATSTE woord als doorslaggevend achternaam-deel,
-    # maar voor namen met tussenvoegsel (van, de, der...) nemen we alles
-    # behalve het allereerste woord als "achternaam-blok".
-    TUSSENVOEGSELS = {"van", "de", "der", "den", "du", "le", "la", "di", "del", "von"}
-
-    def split_name(norm: str):
-        """Geeft (voornaam_eerste_letter, achternaam_blok) terug."""
-        words = norm.split()
-        if not words:
-            return "", ""
-        # Zoek het eerste woord dat GEEN tussenvoegsel is en niet het enige woord
-        for i, w in enumerate(words):
-            if w not in TUSSENVOEGSELS:
-                # Dit is de voornaam (of begin van voornaam)
-                voornaam_letter = w[0] if w else ""
-                achternaam = " ".join(words[i+1:]) if i + 1 < len(words) else ""
-                return voornaam_letter, achternaam
-        # Alles is tussenvoegsel (onwaarschijnlijk)
-        return words[0][0], " ".join(words[1:])
-
     def find_best_match_strict(input_name):
         norm_input = normalize_name(input_name)
         words_input = norm_input.split()
 
         # Probeer alle rotaties van de invoer (voor/achternaam kunnen omgewisseld zijn)
-        rotaties = []
+        # en neem de match die het eerst in all_riders staat.
+        best = None
         for i in range(len(words_input)):
-            rotaties.append(words_input[i:] + words_input[:i])
+            rot = words_input[i:] + words_input[:i]
+            # Probeer: rot[0] = voornaam, rot[1:] = achternaam
+            if len(rot) < 2:
+                continue
+            positie = paste_index["keys"].get((" ".join(rot[1:]), rot[0][0]))
+            if positie is not None and (best is None or positie < best):
+                best = positie
 
-        for original in all_riders:
-            norm_original = normalize_name(original)
-            words_orig = norm_original.split()
+        return best
 
-            for rot in rotaties:
-                # Probeer: rot[0] = voornaam, rot[1:] = achternaam
-                if len(rot) < 2:
-                    continue
-                voornaam_letter = rot[0][0] if rot[0] else ""
-                achternaam_input = " ".join(rot[1:])
+    posities = [find_best_match_strict(kandidaat) for kandidaat in kandidaten_gefilterd]
+    # Wat strikt niet lukt (tikfouten, andere schrijfwijze): samen in één fuzzy pass
+    missers = [i for i, positie in enumerate(posities) if positie is None]
+    fuzzy = fuzzy_resolve([normalize_name(kandidaten_gefilterd[i]) for i in missers], paste_index["choices"],
+                          scorer=fuzz.token_sort_ratio, score_cutoff=PASTE_FUZZY_CUTOFF)
+    # token_sort_ratio negeert bovendien de woordvolgorde ("Thomas Bonnet" ~ "Benjamin
+    # Thomas"): daarom enkel suggesties, de gebruiker bevestigt
+    suggesties = {i: positie for i, positie in zip(missers, fuzzy) if positie is not None}
 
-                # Achternaam van de bekende renner bepalen
-                _, achternaam_orig = split_name(norm_original)
+    matched = []
+    al_gevonden = set()
+    niet_gevonden = []
+    voorgesteld = []
+    for i, (kandidaat, positie) in enumerate(zip(kandidaten_gefilterd, posities)):
+        if positie is None:
+            if i in suggesties:
+                voorgesteld.append((kandidaat, all_riders[suggesties[i]]))
+            elif looks_like_name(kandidaat):
+                niet_gevonden.append(kandidaat)
+            continue
+        match = all_riders[positie]
+        if match not in al_gevonden:
+            matched.append(match)
+            al_gevonden.add(match)
+    # Dezelfde regel twee keer geplakt: één suggestie (de checkbox-key is per regel)
+    voorgesteld = [
+        (regel, renner) for regel, renner in dict.fromkeys(voorgesteld) if renner not in al_gevonden
+    ]
 
-                if not achternaam_input or not achternaam_orig:
-                    continue
+    return matched, niet_gevonden, voorgesteld
 
-                # Achternaam moet exact overeenkomen
-                if achternaam_input != achternaam_orig:
-                    continue
+def looks_like_name(s: str) -> bool:
+    """Twee tot vijf woorden van enkel letters (en - of '): de vorm van een rennersnaam, geen losse ruis."""
+    words = s.split()
+    return 2 <= len(words) <= 5 and all(re.fullmatch(r"[^\W\d_]+(?:[-'’][^\W\d_]+)*\.?", w) for w in words)
 
-                # Eerste letter voornaam moet kloppen
-                voornaam_letter_orig, _ = split_name(norm_original)
-                if voornaam_letter and voornaam_letter_orig and voornaam_letter != voornaam_letter_orig:
-                    continue
+# ── Plak-index ────────────────────────────────────────────────────────────────
+# We beschouwen het LAATSTE woord als doorslaggevend achternaam-deel,
+# maar voor namen met tussenvoegsel (van, de, der...) nemen we alles
+# behalve het allereerste woord als "achternaam-blok".
+TUSSENVOEGSELS = {"van", "de", "der", "den", "du", "le", "la", "di", "del", "von"}
 
-                return original
+def split_name(norm: str):
+    """Geeft (voornaam_eerste_letter, achternaam_blok) terug."""
+    words = norm.split()
+    if not words:
+        return "", ""
+    # Zoek het eerste woord dat GEEN tussenvoegsel is en niet het enige woord
+    for i, w in enumerate(words):
+        if w not in TUSSENVOEGSELS:
+            # Dit is de voornaam (of begin van voornaam)
+            voornaam_letter = w[0] if w else ""
+            achternaam = " ".join(words[i+1:]) if i + 1 < len(words) else ""
+            return voornaam_letter, achternaam
+    # Alles is tussenvoegsel (onwaarschijnlijk)
+    return words[0][0], " ".join(words[1:])
 
-        return None
+@timed_stage("namen.plak_index")
+def build_paste_index(all_riders: list) -> dict:
+    """
+    Eén keer op te bouwen per lijst renners:
+    - "keys":    (achternaam_blok, eerste letter voornaam) → positie van de eerste
+                 renner in all_riders met die sleutel; een geplakte regel kost
+                 daarna enkel een dict-lookup per rotatie
+    - "choices": genormaliseerde namen in all_riders-volgorde, voor de fuzzy fallback
+    """
+    keys = {}
+    choices = []
+    for positie, original in enumerate(all_riders):
+        norm = normalize_name(original)
+        choices.append(norm)
+        voornaam_letter, achternaam = split_name(norm)
+        if not achternaam:
+            continue
+        keys.setdefault((achternaam, voornaam_letter), positie)
+    return {"keys": keys, "choices": choices}
 
-    matched = []
-    al_gevonden = set()
-    for kandidaat in kandidaten_gefilterd:
-        match = find_best_match_strict(kandidaat)
-        if match and match not in al_gevonden:
-            matched.append(match)
-            al_gevonden.add(match)
+# ── Rennersregister ───────────────────────────────────────────────────────────
+# Eén onveranderlijk register per proces, gedeeld door alle sessies via
+# st.cache_resource (st.cache_data geeft elke oproep een eigen kopie). Namen
+# zijn geïnterneerd, de kolommen zijn arrays; een sessie bewaart enkel haar
+# eigen rider-ID's (posities in "names") en de registerversie, nooit het
+# register zelf: zo houdt een open sessie geen verouderd register in leven.
+REGISTRY_HISTORY = 8    # zoveel vorige namenlijsten onthouden om ID's van oudere versies over te zetten
+
+@st.cache_resource
+def _registry_history_store() -> tuple:
+    """Per proces: registerversie → namen (enkel de namen, niet het hele register)."""
+    return threading.Lock(), collections.OrderedDict()
+
+_registry_history_lock, _registry_history = _registry_history_store()
+
+def _remember_registry_names(registry: dict):
+    with _registry_history_lock:
+        _registry_history[registry["version"]] = registry["names"]
+        _registry_history.move_to_end(registry["version"])
+        while len(_registry_history) > REGISTRY_HISTORY:
+            _registry_history.popitem(last=False)
+
+def build_rider_registry(all_riders: list, participation: dict, rider_index: dict, values: pd.DataFrame) -> dict:
+    """
+    - "names":       geïnterneerde weergavenamen (ID = positie), alfabetisch
+    - "ids":         naam → ID
+    - "paste_index": build_paste_index over names; "choices" zijn de genormaliseerde namen
+    - "price":       prijs per ID (NaN als onbekend)
+    - "matrix_row":  rij in de deelnamematrix per ID (-1 als onbekend)
+    - "participation", "rider_index", "values": de gedeelde bronnen zelf
+    """
+    names = tuple(sys.intern(r) for r in all_riders)
+    keys = [lookup_rider_id(name, rider_index) for name in names]
+    matrix_index = participation["matrix"].index
+    matrix_row = np.array([matrix_index.get_loc(k) if k in matrix_index else -1 for k in keys], dtype=np.int32)
+    price = values["prijs"].reindex(keys).to_numpy(dtype=np.float64) if len(values) else np.full(len(names), np.nan)
+    version = hashlib.sha256(
+        "\n".join(names).encode("utf-8") + participation["version"].encode() + np.nan_to_num(price, nan=-1).tobytes()
+    ).hexdigest()[:16]
+    return {
+        "version": version,
+        "names": names,
+        "ids": {name: i for i, name in enumerate(names)},
+        "paste_index": build_paste_index(list(names)),
+        "price": price,
+        "matrix_row": matrix_row,
+        "participation": participation,
+        "rider_index": rider_index,
+        "values": values,
+    }
+
+@by_startlist_version(cache=st.cache_resource(ttl=300, max_entries=2, show_spinner=False))
+def get_rider_registry(met_prijzen: bool, version: str) -> dict:
+    """
+    Het gedeelde register, per startlijstversie (en om de 5 minuten voor de prijzen).
+    Zolang de live prijzen nog laden (met_prijzen=False) komen de prijzen enkel
+    uit data/; daarna wordt het herbouwd.
+    """
+    values = get_rider_values() if met_prijzen else local_rider_values()
+    registry = build_rider_registry(
+        get_all_pcs_riders.at(version), get_participation.at(version), get_rider_index.at(version), values
+    )
+    _remember_registry_names(registry)
+    return registry
+
+def registry_names(registry: dict, ids) -> list:
+    names = registry["names"]
+    return [names[i] for i in ids]
+
+def registry_ids(registry: dict, names) -> list:
+    """ID's van de gegeven namen; namen die niet (meer) in het register staan vallen weg."""
+    ids = registry["ids"]
+    return [ids[name] for name in names if name in ids]
+
+def sync_registry_ids(old_version, registry: dict, rider_ids: list) -> list:
+    """
+    Vertaalt ID's van een vorige registerversie naar het huidige register (via de
+    namen uit de registergeschiedenis). Is die versie al vergeten, dan valt de
+    selectie weg i.p.v. op verkeerde renners te landen.
+    """
+    if old_version is None or old_version == registry["version"]:
+        return list(rider_ids)
+    with _registry_history_lock:
+        old_names = _registry_history.get(old_version)
+    if old_names is None:
+        return []
+    return registry_ids(registry, [old_names[i] for i in rider_ids if i < len(old_names)])
+
+# ── Transferoptimalisatie ─────────────────────────────────────────────────────
+OPSTELLING = 12     # zoveel renners per koers kunnen punten scoren
+CATEGORIE_GEWICHT = {"Monument": 2.0, "World Tour": 1.5, "Niet-World Tour": 1.0}
+
+def parse_decimal(value) -> float:
+    """"1,5" / 1.5 / NaN → float (0.0 als het geen getal is)."""
+    try:
+        number = float(str(value).replace(",", "."))
+    except ValueError:
+        return 0.0
+    return 0.0 if number != number else number
+
+def rider_values(df: pd.DataFrame) -> pd.DataFrame:
+    """Prijs (€) en punten per miljoen (Ptn/M) per rider-ID; de eerste rij per renner wint."""
+    if df.empty or "Renner" not in df.columns or "€" not in df.columns:
+        return pd.DataFrame(columns=["prijs", "ptn_m"], dtype=float)
+    df = df.dropna(subset=["Renner", "€"])
+    values = pd.DataFrame({
+        "prijs": pd.to_numeric(df["€"], errors="coerce").to_numpy(),
+        "ptn_m": [parse_decimal(v) for v in df["Ptn/M"]] if "Ptn/M" in df.columns else 0.0,
+    }, index=[rider_key(pcs_format(r)) for r in df["Renner"]])
+    values = values.dropna(subset=["prijs"])
+    return values[~values.index.duplicated()]
+
+def local_rider_values() -> pd.DataFrame:
+    """Prijzen uit data/: dataset.csv, aangevuld met PrijzenWielermanager.xlsx."""
+    return rider_values(load_dataset()).combine_first(rider_values(load_prijzen_xlsx()))
+
+@cached_data(ttl=300)
+def get_rider_values() -> pd.DataFrame:
+    """Live Datawrapper-prijzen, aangevuld met de lokale bestanden in data/."""
+    return rider_values(load_prijzen_csv()).combine_first(local_rider_values())
+
+def _coverage(weights: np.ndarray, race_weights: np.ndarray, cap: int) -> float:
+    """Som per koers van de `cap` hoogste rennersgewichten, gewogen per koers."""
+    if len(weights) > cap:
+        weights = np.partition(weights, len(weights) - cap, axis=0)[-cap:]
+    return float(weights.sum(axis=0) @ race_weights)
+
+def _marginal_gains(base: np.ndarray, candidates: np.ndarray, race_weights: np.ndarray, cap: int) -> np.ndarray:
+    """Exacte winst van elke kandidaat afzonderlijk bovenop het basisteam."""
+    if len(base) >= cap:
+        drempel = np.partition(base, len(base) - cap, axis=0)[len(base) - cap]
+    else:
+        drempel = np.zeros(base.shape[1])
+    return np.maximum(candidates - drempel, 0) @ race_weights
+
+def solve_transfers(team: np.ndarray, team_cost: np.ndarray, candidates: np.ndarray, candidate_cost: np.ndarray,
+                    race_weights: np.ndarray, max_transfers: int, budget: float,
+                    cap: int = OPSTELLING, top_n: int = 10) -> list:
+    """
+    Exacte branch-and-bound over ruilsets (k uit, k in) met 1 <= k <= max_transfers.
+    team / candidates: gewicht per renner × koers (0 = start niet). Maximaliseert
+    _coverage binnen budget: kost(in) - kost(uit) <= budget. De dekking is submodulair,
+    dus de som van de losse winsten is een geldige bovengrens om takken af te snoeien.
+    Geeft de top_n als [(dekking, uit-indices, in-indices, kostverschil)], beste eerst.
+    """
+    beste = []  # min-heap van (dekking, -kost, uit, in)
+    volgnummer = itertools.count()
+
+    def drempel():
+        return beste[0][0] if len(beste) >= top_n else -np.inf
+
+    def bewaar(score, kost, uit, in_):
+        item = (score, -kost, next(volgnummer), uit, in_)
+        if len(beste) < top_n:
+            heapq.heappush(beste, item)
+        else:
+            heapq.heappushpop(beste, item)
+
+    def uitbreiden(base, f_base, toegelaten, gekozen, kost, nodig, uit, uit_kost):
+        gains = _marginal_gains(base, candidates[toegelaten], race_weights, cap)
+        if nodig == 1:
+            waarden = f_base + gains
+            totaal = kost + candidate_cost[toegelaten]
+            haalbaar = (totaal <= budget + uit_kost) & (waarden > drempel())
+            for pos in np.flatnonzero(haalbaar):
+                bewaar(float(waarden[pos]), float(totaal[pos]) - uit_kost, uit, gekozen + (int(toegelaten[pos]),))
+            return
+        volgorde = np.argsort(-gains, kind="stable")
+        gesorteerd = gains[volgorde]
+        # Goedkoopste aanvulling voor de overige plaatsen, om onbetaalbare takken over te slaan
+        min_rest = np.sort(candidate_cost[toegelaten])[:nodig - 1].sum()
+        for pos in range(len(volgorde) - nodig + 1):
+            grens = f_base + gesorteerd[pos:pos + nodig].sum()
+            if grens <= drempel():
+                break
+            i = toegelaten[volgorde[pos]]
+            if kost + candidate_cost[i] + min_rest > budget + uit_kost:
+                continue
+            uitbreiden(np.vstack([base, candidates[i]]), f_base + gesorteerd[pos],
+                       toegelaten[volgorde[pos + 1:]], gekozen + (int(i),),
+                       kost + candidate_cost[i], nodig - 1, uit, uit_kost)
+
+    alle = np.arange(len(candidates))
+    for k in range(1, max_transfers + 1):
+        if k > len(team) or k > len(candidates):
+            break
+        # Eerst de uit-sets met de hoogste bovengrens; de rest valt meestal meteen af
+        uit_sets = []
+        for uit in itertools.combinations(range(len(team)), k):
+            base = np.delete(team, uit, axis=0)
+            f_base = _coverage(base, race_weights, cap)
+            gains = _marginal_gains(base, candidates, race_weights, cap)
+            grens = f_base + np.sort(gains)[-k:].sum()
+            uit_sets.append((grens, uit, base, f_base))
+        uit_sets.sort(key=lambda x: -x[0])
+        for grens, uit, base, f_base in uit_sets:
+            if grens <= drempel():
+                break
+            uitbreiden(base, f_base, alle, (), 0.0, k, uit, float(team_cost[list(uit)].sum()))
+
+    return [(score, uit, in_, -neg_kost) for score, neg_kost, _, uit, in_ in sorted(beste, reverse=True)]
+
+@timed_stage("transfers.optimaliseren")
+def optimize_transfers(selected_riders, budget: float, max_transfers: int,
+                       weigh_categories: bool = False, weigh_points: bool = False,
+                       top_n: int = 10, participation: dict = None, values: pd.DataFrame = None,
+                       rider_index: dict = None) -> dict:
+    """
+    Beste ruilsets voor het huidige team: maximale dekking van de toekomstige koersen
+    (per koers tellen de OPSTELLING beste renners), binnen het resterende budget.
+    Optioneel gewogen per koerscategorie (CATEGORIE_GEWICHT) en per renner (1 + Ptn/M).
+    """
+    if participation is None:
+        participation = get_participation()
+    if values is None:
+        values = get_rider_values()
+    matrix = participation["matrix"]
+    open_koersen = future_races() & races_with_data(participation)
+    koersen = [race_name for race_name in matrix.columns if open_koersen[race_name]]
+    categorieen = {race_name: category for race_name, _, category in races}
+    race_weights = np.array([
+        CATEGORIE_GEWICHT.get(categorieen[race_name], 1.0) if weigh_categories else 1.0
+        for race_name in koersen
+    ])
+    deelname = matrix[koersen].to_numpy(dtype=float)
+    rider_weight = (1.0 + values["ptn_m"].reindex(matrix.index).fillna(0.0).to_numpy()) if weigh_points else np.ones(len(matrix))
+    gewichten = deelname * rider_weight[:, None]
+    prijzen = values["prijs"].reindex(matrix.index).to_numpy()
+
+    index = get_rider_index() if rider_index is None else rider_index
+    team_ids = [lookup_rider_id(rider, index) for rider in selected_riders]
+    rijen = {rid: i for i, rid in enumerate(matrix.index)}
+    team = np.array([gewichten[rijen[rid]] if rid in rijen else np.zeros(gewichten.shape[1]) for rid in team_ids]).reshape(len(team_ids), -1)
+    team_cost = np.array([values["prijs"].get(rid, 0.0) for rid in team_ids], dtype=float)
+
+    # Kandidaten: geprijsde renners buiten het team. Wie geen enkele toekomstige koers rijdt,
+    # telt enkel als goedkope opvulling, dus daarvan volstaan de goedkoopsten.
+    buiten = ~matrix.index.isin(set(team_ids)) & ~np.isnan(prijzen)
+    actief = np.flatnonzero(buiten & (gewichten.sum(axis=1) > 0))
+    opvulling = np.flatnonzero(buiten & (gewichten.sum(axis=1) == 0))
+    opvulling = opvulling[np.argsort(prijzen[opvulling], kind="stable")[:max_transfers]]
+    kandidaat_rijen = np.concatenate([actief, opvulling])
+
+    oplossingen = solve_transfers(
+        team, team_cost, gewichten[kandidaat_rijen], prijzen[kandidaat_rijen],
+        race_weights, max_transfers, budget, top_n=top_n,
+    )
+    huidig = _coverage(team, race_weights, OPSTELLING)
+    namen = participation["names"]
+    return {
+        "huidige_dekking": huidig,
+        "transfers": [
+            {
+                "uit": [selected_riders[i] for i in uit],
+                "in": [namen[matrix.index[kandidaat_rijen[j]]] for j in in_],
+                "dekking": score,
+                "winst": score - huidig,
+                "kost": kost,
+            }
+            for score, uit, in_, kost in oplossingen
+            if score > huidig
+        ],
+    }
+
+# ── Wat-als-simulator ─────────────────────────────────────────────────────────
+# Evalueert alle ruilsets (k uit, k in) tegelijk als matrixbewerkingen op de
+# bool-matrix renner × koers: per k is het resultaat basis - uit-sommen
+# + in-sommen, uitgezet als (uit-sets × in-sets × koersen).
+WHATIF_MAX_SCENARIOS = 250_000    # per rerun; bij k > 1 krimpt de kandidatenpool tot dit past
+WHATIF_TOP = 25                   # zoveel scenario's tonen we
+
+def _combinations(n: int, k: int) -> np.ndarray:
+    return np.array(list(itertools.combinations(range(n), k)), dtype=np.int32).reshape(-1, k)
+
+def _whatif_pool_sizes(n_team: int, n_candidates: int, max_transfers: int, max_scenarios: int) -> list:
+    """
+    Kandidatenpool per k (1..max_transfers): enkele ruilen altijd over alle
+    kandidaten, grotere ruilsets delen de rest van max_scenarios en krijgen de
+    grootste pool die daarin past (minstens k).
+    """
+    pools = [n_candidates]
+    over = max(max_scenarios - n_team * n_candidates, 0)
+    for k in range(2, max_transfers + 1):
+        deel = over // (max_transfers - k + 1)
+        pool = n_candidates
+        while pool > k and math.comb(n_team, k) * math.comb(pool, k) > deel:
+            pool -= 1
+        pools.append(pool)
+        over -= math.comb(n_team, k) * math.comb(pool, k)
+    return pools
+
+def simulate_swaps(team: np.ndarray, team_cost: np.ndarray, candidates: np.ndarray, candidate_cost: np.ndarray,
+                   max_transfers: int, pools: list = None) -> dict:
+    """
+    team / candidates: bool renner × koers (enkel de koersen die meetellen).
+    pools: per k enkel de eerste pools[k - 1] kandidaten (standaard allemaal).
+    Geeft per scenario (alle k uit team, k uit candidates, 1 <= k <= max_transfers):
+    - "uit", "in":  indices, aangevuld met -1 tot max_transfers kolommen
+    - "counts":     renners per koers na de ruil
+    - "zwak":       aantal koersen met counts <= ZWAK_BEZET
+    - "deelnames":  totaal aantal starts
+    - "kost":       prijs(in) - prijs(uit); NaN als een inkomende prijs onbekend is
+    """
+    basis = team.sum(axis=0, dtype=np.int16)
+    uit_blokken, in_blokken, count_blokken, kost_blokken = [], [], [], []
+    for k in range(1, max_transfers + 1):
+        pool = len(candidates) if pools is None else min(pools[k - 1], len(candidates))
+        if k > len(team) or k > pool:
+            break
+        uit, in_ = _combinations(len(team), k), _combinations(pool, k)
+        uit_som = team[uit].sum(axis=1, dtype=np.int16)
+        in_som = candidates[in_].sum(axis=1, dtype=np.int16)
+        counts = (basis - uit_som)[:, None, :] + in_som[None, :, :]
+        kost = candidate_cost[in_].sum(axis=1)[None, :] - team_cost[uit].sum(axis=1)[:, None]
+        pad = np.full((len(uit), len(in_), max_transfers - k), -1, dtype=np.int32)
+        uit_blokken.append(np.concatenate([np.broadcast_to(uit[:, None, :], (len(uit), len(in_), k)), pad], axis=2).reshape(-1, max_transfers))
+        in_blokken.append(np.concatenate([np.broadcast_to(in_[None, :, :], (len(uit), len(in_), k)), pad], axis=2).reshape(-1, max_transfers))
+        count_blokken.append(counts.reshape(len(uit) * len(in_), team.shape[1]))
+        kost_blokken.append(kost.reshape(-1))
+    if not count_blokken:
+        leeg = np.empty((0, max_transfers), dtype=np.int32)
+        return {"uit": leeg, "in": leeg, "counts": np.empty((0, team.shape[1]), dtype=np.int16),
+                "zwak": np.empty(0, dtype=int), "deelnames": np.empty(0, dtype=int), "kost": np.empty(0)}
+    counts = np.concatenate(count_blokken)
+    return {
+        "uit": np.concatenate(uit_blokken),
+        "in": np.concatenate(in_blokken),
+        "counts": counts,
+        "zwak": (counts <= ZWAK_BEZET).sum(axis=1),
+        "deelnames": counts.sum(axis=1, dtype=np.int64),
+        "kost": np.concatenate(kost_blokken),
+    }
+
+@timed_stage("transfers.wat_als")
+def what_if_transfers(team_ids: list, candidate_ids: list, registry: dict, max_transfers: int,
+                      max_scenarios: int = WHATIF_MAX_SCENARIOS, now: float = None) -> dict:
+    """
+    Wat-als over register-ID's: enkel de toekomstige koersen met data tellen mee.
+    Past niet alles in max_scenarios, dan rekenen de grotere ruilsets enkel met
+    de beste kandidaten voor de standaardrangschikking: eerst wie het meest start
+    in zwak bezette koersen die max_transfers ruilen nog boven ZWAK_BEZET kunnen
+    tillen, dan in alle zwak bezette koersen, dan in het algemeen. Geeft
+    simulate_swaps plus "races", "huidig" (counts zonder ruil), "team_ids",
+    "candidate_ids" (in die volgorde) en "pools" terug.
+    """
+    participation = registry["participation"]
+    matrix = participation["matrix"]
+    relevant = _future_mask(matrix.columns, now) & races_with_data(participation).reindex(matrix.columns).to_numpy(dtype=bool)
+    waarden = np.vstack([matrix.to_numpy(dtype=bool)[:, relevant], np.zeros((1, int(relevant.sum())), dtype=bool)])
 
-    return matched, []
+    def rijen(ids):
+        # -1 (niet in de matrix) wijst naar de nulrij achteraan
+        return waarden[registry["matrix_row"][np.asarray(ids, dtype=np.int64)]] if len(ids) else waarden[:0]
+
+    team_ids = list(team_ids)
+    in_team = set(team_ids)
+    kandidaten = np.array([i for i in candidate_ids if i not in in_team], dtype=np.int64)
+    kandidaat_rijen = rijen(kandidaten)
+    team = rijen(team_ids)
+    huidig = team.sum(axis=0)
+    zwak = huidig <= ZWAK_BEZET
+    haalbaar = zwak & (huidig > ZWAK_BEZET - max_transfers)
+    volgorde = np.lexsort((
+        -kandidaat_rijen.sum(axis=1), -kandidaat_rijen[:, zwak].sum(axis=1), -kandidaat_rijen[:, haalbaar].sum(axis=1),
+    ))
+    kandidaten, kandidaat_rijen = kandidaten[volgorde], kandidaat_rijen[volgorde]
+    pools = _whatif_pool_sizes(len(team_ids), len(kandidaten), max_transfers, max_scenarios)
+    team_cost = np.nan_to_num(registry["price"][np.asarray(team_ids, dtype=np.int64)]) if team_ids else np.empty(0)
+    result = simulate_swaps(team, team_cost, kandidaat_rijen, registry["price"][kandidaten], max_transfers, pools)
+    result.update({
+        "races": list(matrix.columns[relevant]),
+        "huidig": team.sum(axis=0, dtype=np.int16),
+        "team_ids": team_ids,
+        "candidate_ids": kandidaten.tolist(),
+        "pools": pools,
+    })
+    return result
+
+WHATIF_RANKING = {
+    "Minste zwak bezette koersen": lambda r: np.lexsort((np.nan_to_num(r["kost"], nan=np.inf), -r["deelnames"], r["zwak"])),
+    "Meeste deelnames": lambda r: np.lexsort((np.nan_to_num(r["kost"], nan=np.inf), r["zwak"], -r["deelnames"])),
+    "Goedkoopst": lambda r: np.lexsort((-r["deelnames"], r["zwak"], np.nan_to_num(r["kost"], nan=np.inf))),
+}
+
+def rank_what_if(result: dict, ranking: str, budget: float = None, top_n: int = WHATIF_TOP) -> np.ndarray:
+    """Indices van de top_n scenario's volgens WHATIF_RANKING; met budget enkel betaalbare (en geprijsde) ruilen."""
+    volgorde = WHATIF_RANKING[ranking](result)
+    if budget is not None:
+        volgorde = volgorde[result["kost"][volgorde] <= budget]
+    return volgorde[:top_n]
 
 # ── Streamlit UI ──────────────────────────────────────────────────────────────
-st.title("🚴 Wielermanager Tools")
-
-if "search_button" not in st.session_state:
-    st.session_state.search_button = False
-if "selected_riders" not in st.session_state:
-    st.session_state.selected_riders = []
-
-st.subheader("📋 Snel jouw team invoeren")
-st.caption("💡 Tip: ga naar 'Mijn ploeg' → 'Mijn renners' op de wielermanager-site, selecteer alles en plak het hieronder. Ploegnamen, prijzen en andere tekst worden automatisch genegeerd.")
-rider_input = st.text_area(
-    "Plak of typ rennersnamen (gescheiden door komma's of nieuwe regels):",
-    placeholder="bv: Wout Van Aert, Van Der Poel, Pogacar...",
-    height=200,
-)
+# Alleen als app (streamlit run); bij import blijft de module vrij van UI en netwerk.
+if __name__ == "__main__":
+    set_background()
+    start_refresh_scheduler()
+    # Prijzen en startlijsten laden in de achtergrond; de UI tekent intussen al
+    laden = start_background_load()
+    klaar = wait_for_background_load(laden)
 
-if st.button("✅ Voeg toe"):
-    if rider_input:
-        matched_riders, niet_gevonden = extract_riders_from_paste(
-            rider_input, st.session_state.all_riders
-        )
-        if matched_riders:
-            st.session_state.selected_riders = matched_riders
-            st.success(f"✅ {len(matched_riders)} renners herkend en toegevoegd!")
-        if niet_gevonden:
-            st.warning(f"⚠️ Niet herkend (genegeerd): {', '.join(niet_gevonden)}")
-        if len(matched_riders) != 20:
-            st.warning(f"⚠️ Let op! Je hebt {len(matched_riders)} renners (verwacht: 20).")
-
-st.subheader("📋 Selecteer je team")
-selected_riders = st.multiselect(
-    "Kies jouw renners:", st.session_state.all_riders,
-    default=st.session_state.get("selected_riders", [])
-)
+    st.title("🚴 Wielermanager Tools")
+
+    if "search_button" not in st.session_state:
+        st.session_state.search_button = False
+    if "selected_ids" not in st.session_state:
+        st.session_state.selected_ids = []
 
-if st.button("🔍 Zoeken"):
-    st.session_state.search_button = True
-    if len(selected_riders) != 20:
-        st.warning(f"⚠️ Let op! Je hebt {len(selected_riders)} renners geselecteerd (verwacht: 20).")
-
-if st.session_state.search_button and selected_riders:
-    with st.spinner("Bezig met ophalen van data..."):
-        results, rider_participation, rider_schedule, recommended_transfers = fetch_data(selected_riders)
-
-    df = pd.DataFrame(results)
-    df.index = df.index + 1
-    st.dataframe(df.drop(columns=["Datum"]))
-
-    st.subheader("📅 Overzicht: Welke renners starten in welke wedstrijd?")
-    schedule_met_prijzen = {r + get_rider_price(r): v for r, v in rider_schedule.items()}
-    schedule_df = pd.DataFrame.from_dict(schedule_met_prijzen, orient="index")
-    st.dataframe(schedule_df)
-
-    st.subheader("🔍 Vergelijk mogelijke transfers")
-    available_transfers = [r for r in st.session_state.all_riders if r not in selected_riders]
-    transfer_riders = st.multiselect("Voer renners in om hun wedstrijdschema te vergelijken:", available_transfers)
-    if transfer_riders:
-        with st.spinner("Bezig met ophalen van schema's..."):
-            transfer_schedule = fetch_rider_schedule(transfer_riders)
-        st.subheader("📅 Wedstrijdschema van mogelijke transfers")
-        st.dataframe(pd.DataFrame.from_dict(transfer_schedule, orient="index").sort_index())
-
-    st.subheader("🔄 Voorgestelde transfers voor zwak bezette toekomstige wedstrijden")
-    rec_df = pd.DataFrame(
-        sorted(recommended_transfers.items(), key=lambda x: x[1], reverse=True),
-        columns=["Renner", "Aantal wedstrijden met laag aantal deelnemers"]
+    st.subheader("📋 Snel jouw team invoeren")
+    st.caption("💡 Tip: ga naar 'Mijn ploeg' → 'Mijn renners' op de wielermanager-site, selecteer alles en plak het hieronder. Ploegnamen, prijzen en andere tekst worden automatisch genegeerd.")
+    rider_input = st.text_area(
+        "Plak of typ rennersnamen (gescheiden door komma's of nieuwe regels):",
+        placeholder="bv: Wout Van Aert, Van Der Poel, Pogacar...",
+        height=200,
     )
-    rec_df["Renner"] = rec_df["Renner"].apply(lambda r: r + get_rider_price(r))
-    st.dataframe(rec_df.set_index("Renner"))
-
-    st.subheader("🏁 Jouw startlijst per wedstrijd")
-    next_race = get_next_race()
-    wedstrijd_optie = st.selectbox(
-        "Selecteer een wedstrijd:",
-        [race[0] for race in races],
-        index=[race[0] for race in races].index(next_race)
+
+    # ── Laadstatus; tot alles er is, rekent alles hieronder met wat er al is ──
+    if not klaar:
+        st.session_state.laadstatus_in_app = True
+        render_loading_status(laden)
+
+    # ── Prijzen ───────────────────────────────────────────────────────────────
+    price_index = get_price_index() if laden["prijzen"].done() else EMPTY_PRICE_INDEX
+
+    # ── Renners: gedeeld register, per sessie enkel ID's ──────────────────────
+    registry = get_rider_registry(laden["prijzen"].done())
+    if st.session_state.get("registry_version") != registry["version"]:
+        # Nieuw register (nieuwe startlijsten of prijzen): selectie via de namen overzetten
+        vorige = st.session_state.get("registry_version")
+        st.session_state.selected_ids = sync_registry_ids(vorige, registry, st.session_state.get("team_ids", st.session_state.selected_ids))
+        st.session_state.registry_version = registry["version"]
+    names = registry["names"]
+
+    if st.button("✅ Voeg toe"):
+        if rider_input:
+            matched_riders, niet_gevonden, suggesties = extract_riders_from_paste(
+                rider_input, names, registry["paste_index"]
+            )
+            st.session_state.suggesties = suggesties
+            if matched_riders:
+                st.session_state.selected_ids = registry_ids(registry, matched_riders)
+                st.success(f"✅ {len(matched_riders)} renners herkend en toegevoegd!")
+            if niet_gevonden:
+                st.warning(f"⚠️ Niet herkend (genegeerd): {', '.join(niet_gevonden)}")
+            if len(matched_riders) != 20:
+                st.warning(f"⚠️ Let op! Je hebt {len(matched_riders)} renners (verwacht: 20).")
+
+    # ── Fuzzy suggesties: pas na bevestiging in het team ──────────────────────
+    if st.session_state.get("suggesties"):
+        st.info("🤔 Bedoelde je …? Vink aan wat klopt.")
+        bevestigd = [
+            renner for regel, renner in st.session_state.suggesties
+            if st.checkbox(f"{renner} (geplakt: '{regel}')", key=f"suggestie_{regel}")
+        ]
+        if st.button("➕ Voeg aangevinkte suggesties toe") and bevestigd:
+            huidig = st.session_state.get("team_ids", st.session_state.selected_ids)
+            st.session_state.selected_ids = list(huidig) + [i for i in registry_ids(registry, bevestigd) if i not in huidig]
+            st.session_state.suggesties = []
+            st.rerun()
+
+    st.subheader("📋 Selecteer je team")
+    team_ids = st.multiselect(
+        "Kies jouw renners:", range(len(names)),
+        default=st.session_state.selected_ids, format_func=names.__getitem__,
     )
-    if wedstrijd_optie:
-        startlist = get_startlist_from_pcs(wedstrijd_optie)
-        team_riders = [r for r in selected_riders if any(names_match(r, s) for s in startlist)]
-        st.subheader(f"🏁 Jouw renners in {wedstrijd_optie}:")
-        if team_riders:
-            for rider in sorted(team_riders, key=lambda r: normalize_name(r).split()[-1]):
-                st.success(f"✅ **{rider}{get_rider_price(rider)}**")
+    st.session_state.team_ids = team_ids
+    selected_riders = registry_names(registry, team_ids)
+
+    if st.button("🔍 Zoeken"):
+        st.session_state.search_button = True
+        if len(selected_riders) != 20:
+            st.warning(f"⚠️ Let op! Je hebt {len(selected_riders)} renners geselecteerd (verwacht: 20).")
+
+    if st.session_state.search_button and selected_riders:
+        with st.spinner("Bezig met ophalen van data..."):
+            participation = registry["participation"]
+            st.session_state.team_evaluation = update_team_evaluation(
+                st.session_state.get("team_evaluation"), selected_riders, participation,
+                rider_index=registry["rider_index"],
+            )
+            results, rider_participation, rider_schedule, recommended_transfers = evaluation_results(
+                st.session_state.team_evaluation, participation
+            )
+
+        df = pd.DataFrame(results)
+        df.index = df.index + 1
+        st.dataframe(df.drop(columns=["Datum"]))
+
+        # ── Wijzigingen sinds de laatste controle (bewaard in de URL) ─────────
+        st.subheader("🔔 Wijzigingen sinds je laatste controle")
+        try:
+            gezien = float(st.query_params["gezien"])
+        except (KeyError, ValueError):
+            gezien = time.time() - CHANGES_DEFAULT_DAYS * 86400
+        wijzigingen = read_startlist_changes(selected_riders, since=gezien)
+        if wijzigingen:
+            cet = pytz.timezone("Europe/Brussels")
+            st.dataframe(pd.DataFrame([
+                {
+                    "Tijdstip": datetime.fromtimestamp(w["changed_at"], cet).strftime("%d/%m %H:%M"),
+                    "Wedstrijd": w["race"],
+                    "Renner": w["rider"],
+                    "Wijziging": "➕ toegevoegd" if w["change"] == "+" else "➖ afgemeld",
+                }
+                for w in wijzigingen
+            ]).set_index("Tijdstip"))
         else:
-            st.warning("🚨 Geen renners van jouw team in deze wedstrijd!")
+            st.caption("Geen wijzigingen in de startlijsten van jouw renners.")
+        if st.button("✔️ Markeer als gezien"):
+            st.query_params["gezien"] = str(int(time.time()))
+            st.rerun()
 
-    st.subheader("📊 Toekomstige deelnames per renner")
-    part_df = pd.DataFrame(
-        sorted(rider_participation.items(), key=lambda x: x[1], reverse=True),
-        columns=["Renner", "Aantal toekomstige deelnames"]
-    )
-    part_df["Renner"] = part_df["Renner"].apply(lambda r: r + get_rider_price(r))
-    st.dataframe(part_df.set_index("Renner"))
+        st.subheader("📅 Overzicht: Welke renners starten in welke wedstrijd?")
+        prijzen = get_rider_prices(list(rider_schedule.index) + list(recommended_transfers), price_index)
+        schedule_df = render_schedule(rider_schedule)
+        schedule_df.index = [r + prijzen[r] for r in schedule_df.index]
+        st.dataframe(schedule_df)
+
+        st.subheader("🔍 Vergelijk mogelijke transfers")
+        in_team = set(team_ids)
+        transfer_ids = st.multiselect(
+            "Voer renners in om hun wedstrijdschema te vergelijken:",
+            [i for i in range(len(names)) if i not in in_team], format_func=names.__getitem__,
+        )
+        if transfer_ids:
+            with st.spinner("Bezig met ophalen van schema's..."):
+                transfer_schedule = fetch_rider_schedule(
+                    registry_names(registry, transfer_ids), participation, registry["rider_index"]
+                )
+            st.subheader("📅 Wedstrijdschema van mogelijke transfers")
+            st.dataframe(render_schedule(transfer_schedule).sort_index())
+
+        st.subheader("🔄 Voorgestelde transfers voor zwak bezette toekomstige wedstrijden")
+        rec_df = pd.DataFrame(
+            sorted(recommended_transfers.items(), key=lambda x: x[1], reverse=True),
+            columns=["Renner", "Aantal wedstrijden met laag aantal deelnemers"]
+        )
+        rec_df["Renner"] = rec_df["Renner"].map(lambda r: r + prijzen[r])
+        st.dataframe(rec_df.set_index("Renner"))
+
+        st.subheader("🧮 Beste transfers binnen je budget")
+        col_budget, col_aantal = st.columns(2)
+        resterend_budget = col_budget.number_input("Resterend budget (M):", min_value=0.0, value=0.0, step=1.0)
+        max_transfers = col_aantal.slider("Maximaal aantal transfers:", 1, 3, 1)
+        col_cat, col_ptn = st.columns(2)
+        weeg_categorie = col_cat.checkbox("Weeg koersen per categorie (Monument zwaarder)")
+        weeg_punten = col_ptn.checkbox("Weeg renners naar Ptn/M")
+        optimalisatie = optimize_transfers(
+            selected_riders, resterend_budget, max_transfers,
+            weigh_categories=weeg_categorie, weigh_points=weeg_punten,
+            participation=participation, values=registry["values"], rider_index=registry["rider_index"],
+        )
+        if optimalisatie["transfers"]:
+            st.dataframe(pd.DataFrame([
+                {
+                    "Uit": ", ".join(t["uit"]),
+                    "In": ", ".join(t["in"]),
+                    "Extra dekking": round(t["winst"], 1),
+                    "Kost (M)": t["kost"],
+                }
+                for t in optimalisatie["transfers"]
+            ], index=range(1, len(optimalisatie["transfers"]) + 1)))
+        else:
+            st.info("Geen transfers gevonden die je dekking van de komende koersen verbeteren binnen dit budget.")
+
+        st.subheader("🧪 Wat als je ruilt?")
+        st.caption("Zonder gekozen renners bij 'Vergelijk mogelijke transfers' rekenen we met alle renners buiten je team.")
+        col_k, col_rang = st.columns(2)
+        wat_als_k = col_k.slider("Aantal ruilen tegelijk:", 1, 3, 1)
+        rangschikking = col_rang.selectbox("Rangschik op:", list(WHATIF_RANKING))
+        binnen_budget = st.checkbox("Enkel ruilen binnen je resterend budget", value=True)
+        wat_als = what_if_transfers(
+            team_ids, transfer_ids or [i for i in range(len(names)) if i not in in_team], registry, wat_als_k
+        )
+        beste = rank_what_if(wat_als, rangschikking, resterend_budget if binnen_budget else None)
+        huidig_zwak = int((wat_als["huidig"] <= ZWAK_BEZET).sum())
+        st.caption(
+            f"{len(wat_als['zwak'])} scenario's doorgerekend over {len(wat_als['candidate_ids'])} kandidaten "
+            f"(bij meerdere ruilen de {min(wat_als['pools'])} met de meeste starts in zwak bezette koersen); "
+            f"nu {huidig_zwak} zwak bezette en {int(wat_als['huidig'].sum())} deelnames."
+        )
+        if not wat_als["races"]:
+            st.info("Geen toekomstige koersen met startlijst meer om ruilen op te testen.")
+        elif len(beste):
+            uit_namen = registry_names(registry, wat_als["team_ids"])
+            in_namen = registry_names(registry, wat_als["candidate_ids"])
+            st.dataframe(pd.DataFrame([
+                {
+                    "Uit": ", ".join(uit_namen[i] for i in wat_als["uit"][s] if i >= 0),
+                    "In": ", ".join(in_namen[i] for i in wat_als["in"][s] if i >= 0),
+                    "Zwak bezet": f"{wat_als['zwak'][s]} ({wat_als['zwak'][s] - huidig_zwak:+d})",
+                    "Deelnames": f"{wat_als['deelnames'][s]} ({wat_als['deelnames'][s] - int(wat_als['huidig'].sum()):+d})",
+                    "Kost (M)": wat_als["kost"][s],
+                    **dict(zip(wat_als["races"], wat_als["counts"][s].tolist())),
+                }
+                for s in beste
+            ], index=range(1, len(beste) + 1)))
+        else:
+            st.info("Geen ruilen gevonden binnen dit budget.")
+
+        st.subheader("🏁 Jouw startlijst per wedstrijd")
+        next_race = get_next_race()
+        wedstrijd_optie = st.selectbox(
+            "Selecteer een wedstrijd:",
+            [race[0] for race in races],
+            index=[race[0] for race in races].index(next_race)
+        )
+        if wedstrijd_optie:
+            team_riders = list(rider_schedule.index[rider_schedule[wedstrijd_optie]])
+            st.subheader(f"🏁 Jouw renners in {wedstrijd_optie}:")
+            if team_riders:
+                for rider in sorted(team_riders, key=lambda r: normalize_name(r).split()[-1]):
+                    st.success(f"✅ **{rider}{prijzen[rider]}**")
+            else:
+                st.warning("🚨 Geen renners van jouw team in deze wedstrijd!")
+
+        st.subheader("📊 Toekomstige deelnames per renner")
+        part_df = pd.DataFrame(
+            sorted(rider_participation.items(), key=lambda x: x[1], reverse=True),
+            columns=["Renner", "Aantal toekomstige deelnames"]
+        )
+        part_df["Renner"] = part_df["Renner"].map(lambda r: r + prijzen[r])
+        st.dataframe(part_df.set_index("Renner"))
+
+        next_race, days, hours, minutes = countdown_to_next_race()
+        if next_race:
+            st.markdown("---")
+            st.subheader(f"⏳ Nog **{days} dagen, {hours} uur en {minutes} minuten** tot **{next_race}**!")
 
-    next_race, days, hours, minutes = countdown_to_next_race()
-    if next_race:
-        st.markdown("---")
-        st.subheader(f"⏳ Nog **{days} dagen, {hours} uur en {minutes} minuten** tot **{next_race}**!")
+    # ── Prestatiediagnose (opt-in) ────────────────────────────────────────────
+    # Als laatste, zodat de metingen van deze run mee in het paneel staan
+    if st.sidebar.checkbox("⏱️ Prestatiediagnose tonen", value=os.environ.get("WIELERMANAGER_DIAGNOSTICS") == "1"):
+        render_metrics_panel()
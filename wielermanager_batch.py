@@ -0,0 +1,167 @@
+"""
+Headless analyse van een hele minicompetitie: per team de herkende (en niet
+herkende) renners, het aantal renners per koers, de toekomstige deelnames en
+de voorgestelde transfers, zonder Streamlit UI.
+
+Invoer is een map met één .txt-bestand per team (bestandsnaam = teamnaam,
+inhoud = geplakte "Mijn renners"-tekst) of een JSONL-bestand met per regel
+{"team": "...", "paste": "..."}.
+
+    python wielermanager_batch.py teams/ -o rapport/
+    python wielermanager_batch.py teams.jsonl -o rapport/ --format parquet --workers 8
+
+Startlijsten en prijzen worden één keer geladen (uit de gedeelde opslag in
+.cache/) en als snapshot aan elke worker meegegeven.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+import pytz
+from streamlit import logger as st_logger
+
+# Buiten `streamlit run` waarschuwen de Streamlit-caches al bij import; dat is hier verwacht
+st_logger.set_log_level(logging.ERROR)
+
+import wielermanager as wm  # noqa: E402
+
+TOP_TRANSFERS = 10      # zoveel voorgestelde transfers per team in de uitvoer
+
+_SNAPSHOT = None
+
+
+def load_teams(path: str) -> list:
+    """[(teamnaam, geplakte tekst)] uit een map met .txt-bestanden of een JSONL-bestand."""
+    if os.path.isdir(path):
+        teams = []
+        for filename in sorted(os.listdir(path)):
+            if filename.endswith(".txt"):
+                with open(os.path.join(path, filename), encoding="utf-8") as f:
+                    teams.append((os.path.splitext(filename)[0], f.read()))
+        return teams
+    teams = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                teams.append((str(entry["team"]), entry["paste"]))
+    return teams
+
+
+def load_snapshot() -> dict:
+    """Alles wat een worker nodig heeft, één keer geladen in het hoofdproces."""
+    wm.load_startlists()    # zonder planner: ontbrekende koersen hier scrapen
+    all_riders = wm.get_all_pcs_riders()
+    return {
+        "all_riders": all_riders,
+        "paste_index": wm.build_paste_index(all_riders),
+        "rider_index": wm.get_rider_index(),
+        "participation": wm.get_participation(),
+        "values": wm.get_rider_values(),
+    }
+
+
+def _init_worker(snapshot: dict):
+    global _SNAPSHOT
+    _SNAPSHOT = snapshot
+
+
+def analyse_team(team: str, paste: str, now: float) -> dict:
+    """Analyse van één team tegen de snapshot van dit proces."""
+    snapshot = _SNAPSHOT
+    participation = snapshot["participation"]
+    riders, niet_gevonden, suggesties = wm.extract_riders_from_paste(paste, snapshot["all_riders"], snapshot["paste_index"])
+    # Onvolledig team: het rapport moet tonen dat de dekking op minder renners steunt
+    niet_herkend = niet_gevonden + [f"{regel} (bedoeld: {renner}?)" for regel, renner in suggesties]
+    state = wm.update_team_evaluation(None, riders, participation, now=now, rider_index=snapshot["rider_index"])
+    results, rider_participation, _, recommended_transfers = wm.evaluation_results(state, participation)
+
+    prijzen = snapshot["values"]["prijs"]
+    rider_index = snapshot["rider_index"]
+    ids = {rider: wm.lookup_rider_id(rider, rider_index) for rider in riders}
+    summary = {
+        "team": team,
+        "renners": len(riders),
+        "niet_herkend": len(niet_herkend),
+        "niet_herkende_regels": "; ".join(niet_herkend),
+        "teamwaarde": float(sum(prijzen.get(ids[r], 0.0) for r in riders)),
+        "toekomstige_deelnames": int(sum(rider_participation.values())),
+        "zwakke_koersen": int(state["weak"].sum()),
+    }
+    summary.update({row["Wedstrijd"]: row["Aantal renners"] for row in results})
+    top = sorted(recommended_transfers.items(), key=lambda x: x[1], reverse=True)[:TOP_TRANSFERS]
+    return {
+        "team": summary,
+        "riders": [
+            {"team": team, "renner": r, "prijs": prijzen.get(ids[r]), "toekomstige_deelnames": rider_participation[r]}
+            for r in riders
+        ],
+        "transfers": [
+            {"team": team, "renner": r, "prijs": prijzen.get(wm.lookup_rider_id(r, rider_index)), "zwakke_koersen": n}
+            for r, n in top
+        ],
+    }
+
+
+def _analyse(args):
+    return analyse_team(*args)
+
+
+def write_table(rows: list, path: str, fmt: str):
+    df = pd.DataFrame(rows)
+    if fmt == "parquet":
+        df.to_parquet(f"{path}.parquet", index=False)
+    else:
+        df.to_csv(f"{path}.csv", index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyseer een hele minicompetitie zonder UI.")
+    parser.add_argument("input", help="map met <team>.txt-bestanden of een JSONL-bestand")
+    parser.add_argument("-o", "--output", default="rapport", help="uitvoermap (standaard: rapport)")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="aantal processen")
+    parser.add_argument("--now", help="analyseer alsof het nu dit tijdstip is (YYYY-MM-DD HH:MM, Brusselse tijd)")
+    args = parser.parse_args(argv)
+    if args.format == "parquet":
+        # Meteen melden, niet pas na de hele analyse bij het wegschrijven
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            parser.error("--format parquet vereist pyarrow (pip install pyarrow); gebruik anders --format csv")
+
+    now = wm.race_start_timestamp(args.now) if args.now else datetime.now(pytz.utc).timestamp()
+    t0 = time.perf_counter()
+    teams = load_teams(args.input)
+    snapshot = load_snapshot()
+    t_snapshot = time.perf_counter()
+
+    workers = max(1, min(args.workers or 1, len(teams) or 1))
+    jobs = [(team, paste, now) for team, paste in teams]
+    if workers == 1:
+        _init_worker(snapshot)
+        analyses = [_analyse(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(snapshot,)) as pool:
+            analyses = list(pool.map(_analyse, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+    os.makedirs(args.output, exist_ok=True)
+    write_table([a["team"] for a in analyses], os.path.join(args.output, "teams"), args.format)
+    write_table([row for a in analyses for row in a["riders"]], os.path.join(args.output, "renners"), args.format)
+    write_table([row for a in analyses for row in a["transfers"]], os.path.join(args.output, "transfers"), args.format)
+    t_done = time.perf_counter()
+    print(
+        f"{len(teams)} teams geanalyseerd met {workers} proces(sen): snapshot {t_snapshot - t0:.1f}s, "
+        f"analyse {t_done - t_snapshot:.1f}s → {args.output}/",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()